@@ -0,0 +1,4 @@
+import sys
+from acoustician_tools.cli import main
+
+sys.exit(main())
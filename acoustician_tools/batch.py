@@ -0,0 +1,88 @@
+"""
+BATCH
+
+This module contains functions for analysing many impulse-response files in parallel.
+"""
+
+import glob
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from acoustician_tools.rir import analyze_ir
+
+
+def _analyze_file(path: str, bands: list, metrics: list, options: dict):
+    """Analyse one file, returning the results or the error raised while analysing it."""
+    try:
+        return analyze_ir(path, bands, metrics, **options), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+def _expand_paths(paths) -> list:
+    """Expand a glob pattern (or a list of paths and patterns) into a list of file paths."""
+    if isinstance(paths, str):
+        paths = [paths]
+    expanded = []
+    for p in paths:
+        p = str(p)
+        matches = sorted(glob.glob(p)) if glob.has_magic(p) else [p]
+        expanded.extend(matches)
+    return expanded
+
+
+def analyze_batch(
+    paths,
+    bands: list,
+    metrics: list = ('c50', 'c80', 'd50', 'edt', 't20', 't30'),
+    workers: int = None,
+    progress=None,
+    **options,
+) -> list:
+    """
+    Calculate acoustic parameters for many impulse-response files, spread across a process pool.
+
+    Files that fail to load or analyse do not stop the batch; their rows are filled with
+    NaN values and the error message.
+
+    Parameters:
+        paths (string or list): Glob pattern, or list of paths and patterns, of .wav files
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        metrics (list): Parameters to be calculated, as accepted by rir.analyze_ir
+        workers (int): Number of worker processes; [default: number of CPUs]
+            1 runs the batch in the current process
+        progress (callable): Called as progress(done, total, path) each time a file finishes
+        **options: Other keyword arguments for rir.analyze_ir (ex: multirate, block_size)
+
+    Returns:
+        table (list): List of rows (dict) with keys 'path', 'channel', 'band', 'metric', 'value'
+            and 'error', one per file, metric, band and channel, in input order; mono files
+            (and files that failed) have a single channel 0
+    """
+    paths = _expand_paths(paths)
+    metrics = [str.lower(str(m)) for m in metrics]
+    outcomes = [None] * len(paths)
+
+    if workers == 1:
+        for i, p in enumerate(paths):
+            outcomes[i] = _analyze_file(p, bands, metrics, options)
+            if progress:
+                progress(i + 1, len(paths), p)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_analyze_file, p, bands, metrics, options): i for i, p in enumerate(paths)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                outcomes[i] = future.result()
+                if progress:
+                    progress(done, len(paths), paths[i])
+
+    table = []
+    for p, (results, error) in zip(paths, outcomes):
+        for m in metrics:
+            values = np.asarray(results[m], dtype=np.float64) if results else np.full(len(bands), np.nan)
+            values = values[:, None] if values.ndim == 1 else values  # [bands, channels]
+            for b, band_values in zip(bands, values):
+                for c, v in enumerate(band_values):
+                    row = {'path': p, 'channel': c, 'band': tuple(b), 'metric': m, 'value': float(v), 'error': error}
+                    table.append(row)
+    return table
@@ -0,0 +1,180 @@
+"""
+CACHE
+
+This module contains a persistent on-disk cache for impulse-response analysis results,
+keyed by the audio content and the analysis settings.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from acoustician_tools import __version__
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'acoustician_tools', 'results.sqlite')
+
+
+def content_digest(source):
+    """
+    Hash the audio content of an impulse-response without decoding or filtering it.
+
+    Parameters:
+        source (string, path, bytes, file-like or tuple): As accepted by the rir metrics
+
+    Returns:
+        source: The same source, or its contents (bytes) if it was a file-like object
+            that had to be read
+        digest (string): Hex digest of the content
+    """
+    h = hashlib.blake2b(digest_size=20)
+    if isinstance(source, tuple):
+        y, sr = source
+        y = np.ascontiguousarray(y)
+        h.update(f'{y.dtype.str}{y.shape}{sr}'.encode())
+        h.update(y.data)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        h.update(source)
+    elif hasattr(source, 'read'):
+        source = source.read()
+        h.update(source)
+    else:
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return source, h.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent cache of analysis results stored in a local SQLite file.
+
+    Entries are evicted least-recently-used first once max_entries is exceeded, and
+    entries written by a different library version are dropped when the cache is opened.
+
+    Parameters:
+        path (string): Location of the SQLite file; [default: ~/.cache/acoustician_tools/results.sqlite]
+        max_entries (int): Maximum number of stored results
+        version (string): Library version tag stored with each entry
+        check_same_thread (bool): Only allow the thread that opened the connection to use it;
+            False shares it between threads (ex: a server), with every access serialized by a lock
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 100000,
+        version: str = __version__,
+        check_same_thread: bool = True,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self.check_same_thread = check_same_thread
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.RLock()
+        self.invalidate()
+
+    def __getstate__(self):
+        # Connections and locks cannot be shared between processes; each process opens its own
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=self.check_same_thread)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results '
+                '(key TEXT PRIMARY KEY, version TEXT, value TEXT, accessed REAL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+        return self._connection
+
+    def key(self, digest: str, bands: list, metric: tuple, **settings) -> str:
+        """
+        Build the cache key of one metric.
+
+        Parameters:
+            digest (string): Audio content digest, as given by content_digest
+            bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+            metric (tuple): Metric kind and argument (ex: ('clarity', 50), ('decay', 't30'))
+            **settings: Other settings affecting the result (ex: filter order, multirate)
+        """
+        spec = [digest, [[float(f) for f in b] for b in bands], list(metric), sorted(settings.items())]
+        return hashlib.blake2b(json.dumps(spec).encode(), digest_size=20).hexdigest()
+
+    def get(self, key: str):
+        """Get a stored result, or None if it is not in the cache."""
+        with self._lock, self.connection as db:
+            row = db.execute('SELECT value FROM results WHERE key = ? AND version = ?', (key, self.version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value):
+        """Store a result, evicting the least recently used entries above max_entries."""
+        with self._lock, self.connection as db:
+            db.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                (key, self.version, json.dumps(value), time.time()),
+            )
+            db.execute(
+                'DELETE FROM results WHERE key IN '
+                '(SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+
+    def invalidate(self, version: str = None):
+        """Remove entries stored by other library versions (or all entries of a given version)."""
+        with self._lock, self.connection as db:
+            if version is None:
+                db.execute('DELETE FROM results WHERE version != ?', (self.version,))
+            else:
+                db.execute('DELETE FROM results WHERE version = ?', (version,))
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        with self._lock, self.connection as db:
+            db.execute('DELETE FROM results')
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            stats (dict): hits, misses, hit_ratio (0-1) and number of stored entries
+        """
+        with self._lock:
+            entries = self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'entries': entries,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
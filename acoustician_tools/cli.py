@@ -0,0 +1,183 @@
+"""
+CLI
+
+This module contains the command-line interface, run as python -m acoustician_tools.
+
+Each command imports the modules it uses when it runs, so starting the interpreter
+does not load numpy or scipy for commands that do not need them (ex: sending a job
+to an analysis server, see server.AnalysisServer).
+"""
+
+import argparse
+import json
+import sys
+
+DEFAULT_URL = 'http://127.0.0.1:8765'
+DEFAULT_METRICS = ['c50', 'c80', 'd50', 'edt', 't20', 't30']
+ANALYSIS_OPTIONS = ('multirate', 'block_size', 'onset_db', 'truncate', 'dtype')
+
+
+def parse_bands(spec, fmin: float = None, fmax: float = None) -> list:
+    """
+    Get a list of frequency bands from a band set name or an explicit list.
+
+    Parameters:
+        spec (string or list): 'octave' or 'third_octave', bands as 'lower-upper' separated
+            by commas (ex: '707-1414,1414-2828'), or a list of tuples (lower, upper) [Hz]
+        fmin (float): Lowest center frequency kept from a band set [Hz]
+        fmax (float): Highest center frequency kept from a band set [Hz]
+
+    Returns:
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+    """
+    if spec in ('octave', 'third_octave'):
+        from acoustician_tools import bands
+
+        band_set = getattr(bands, f'{spec}_bands')()
+        return [
+            tuple(b)
+            for f, b in zip(band_set['f_center'], band_set['f_bound'])
+            if (fmin is None or f >= fmin) and (fmax is None or f <= fmax)
+        ]
+    if isinstance(spec, str):
+        try:
+            spec = [b.split('-') for b in spec.split(',')]
+            return [(float(lower), float(upper)) for lower, upper in spec]
+        except ValueError:
+            raise ValueError(f'Invalid bands {spec!r}; use a band set name or lower-upper pairs.') from None
+    return [(float(lower), float(upper)) for lower, upper in spec]
+
+
+def request(url: str, endpoint: str, payload: dict = None, timeout: float = None) -> dict:
+    """
+    Send a request to an analysis server, with the standard library only.
+
+    Parameters:
+        url (string): Server address (ex: http://127.0.0.1:8765)
+        endpoint (string): 'analyze', 'status' or 'shutdown'
+        payload (dict): JSON body; None sends a GET request
+        timeout (float): Seconds to wait for the response
+
+    Returns:
+        response (dict): Decoded JSON response; errors raised by the analysis are
+            returned under 'error'
+    """
+    from urllib import error, request as urllib_request
+
+    data = None if payload is None else json.dumps(payload).encode()
+    headers = {'Content-Type': 'application/json'}
+    req = urllib_request.Request(f'{url.rstrip("/")}/{endpoint}', data=data, headers=headers)
+    try:
+        with urllib_request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except error.HTTPError as e:
+        return json.loads(e.read())
+
+
+def _analyze_command(args) -> int:
+    options = {k: getattr(args, k) for k in ANALYSIS_OPTIONS if getattr(args, k) not in (None, False)}
+    files = {}
+    if args.server:
+        bands = args.bands  # Resolved by the server
+        for path in args.paths:
+            job = {'path': path, 'bands': bands, 'fmin': args.fmin, 'fmax': args.fmax, 'metrics': args.metrics}
+            response = request(args.server, 'analyze', {**job, 'options': options})
+            files[path] = response.get('results', {'error': response.get('error')})
+            bands = response.get('bands', bands)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        from acoustician_tools.rir import analyze_ir
+
+        bands = parse_bands(args.bands, args.fmin, args.fmax)
+        if args.cache:
+            from acoustician_tools.cache import ResultCache
+
+            options['cache'] = ResultCache(args.cache)
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for path in args.paths:
+                try:
+                    files[path] = analyze_ir(path, bands, args.metrics, workers=executor, **options)
+                except Exception as e:
+                    files[path] = {'error': f'{type(e).__name__}: {e}'}
+
+    json.dump({'bands': bands, 'files': files}, sys.stdout, indent=None if args.compact else 2)
+    print()
+    return 1 if any('error' in r for r in files.values()) else 0
+
+
+def _bands_command(args) -> int:
+    print(json.dumps(parse_bands(args.name, args.fmin, args.fmax)))
+    return 0
+
+
+def _serve_command(args) -> int:
+    from acoustician_tools.server import AnalysisServer
+
+    server = AnalysisServer(args.host, args.port, workers=args.workers, cache_path=args.cache, verbose=args.verbose)
+    print(f'Serving analysis jobs on http://{args.host}:{server.server_port}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def _status_command(args) -> int:
+    print(json.dumps(request(args.server, 'shutdown' if args.shutdown else 'status', {} if args.shutdown else None)))
+    return 0
+
+
+def _add_band_arguments(parser):
+    parser.add_argument('--fmin', type=float, default=125, help='Lowest band center frequency [Hz]')
+    parser.add_argument('--fmax', type=float, default=8000, help='Highest band center frequency [Hz]')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m acoustician_tools', description='Acoustician tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analyze = commands.add_parser('analyze', help='Analyze impulse-response files, printing JSON results')
+    analyze.add_argument('paths', nargs='+', help='.wav impulse-response files')
+    analyze.add_argument('--bands', default='octave', help="'octave', 'third_octave' or lower-upper pairs")
+    _add_band_arguments(analyze)
+    analyze.add_argument('--metrics', nargs='+', default=DEFAULT_METRICS)
+    analyze.add_argument('--onset-db', dest='onset_db', type=float, default=None)
+    analyze.add_argument('--truncate', action='store_true', help='Lundeby noise-floor truncation')
+    analyze.add_argument('--multirate', action='store_true')
+    analyze.add_argument('--block-size', dest='block_size', type=int, default=None, help='Streaming mode')
+    analyze.add_argument('--dtype', default=None, help='Precision of the Schroeder curves (ex: float32)')
+    analyze.add_argument('--workers', type=int, default=None, help='Threads filtering bands concurrently')
+    analyze.add_argument('--cache', default=None, help='Path of a result cache (SQLite file)')
+    analyze.add_argument('--server', default=None, help=f'Send the jobs to an analysis server (ex: {DEFAULT_URL})')
+    analyze.add_argument('--compact', action='store_true', help='Print the JSON on one line')
+    analyze.set_defaults(func=_analyze_command)
+
+    bands = commands.add_parser('bands', help='Print frequency bands as JSON')
+    bands.add_argument('name', nargs='?', default='octave', choices=['octave', 'third_octave'])
+    _add_band_arguments(bands)
+    bands.set_defaults(func=_bands_command)
+
+    serve = commands.add_parser('serve', help='Run an analysis server keeping filters and threads warm')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--workers', type=int, default=None, help='Threads filtering bands concurrently')
+    serve.add_argument('--cache', default=None, help='Path of a result cache (SQLite file)')
+    serve.add_argument('--verbose', action='store_true', help='Log every request')
+    serve.set_defaults(func=_serve_command)
+
+    status = commands.add_parser('status', help='Print the status of an analysis server')
+    status.add_argument('--server', default=DEFAULT_URL)
+    status.add_argument('--shutdown', action='store_true', help='Stop the server')
+    status.set_defaults(func=_status_command)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f'{type(e).__name__}: {e}', file=sys.stderr)
+        return 2
@@ -0,0 +1,247 @@
+"""
+OPTIMIZER
+
+This module contains a search for room treatments, assigning a material from a catalogue
+to each surface of a room so its reverberation time meets a target at every band, at the
+lowest cost.
+"""
+
+import itertools
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from acoustician_tools import room
+
+FORMULAS = room.RT_FORMULAS
+BOUNDED_FORMULAS = ('sabine', 'eyring', 'millington')  # RT decreasing with a sum over surfaces
+
+
+def _problem(volume, surfaces, target, tolerance, catalogue, formula, allowed, decay, c) -> dict:
+    """Arrays describing the search, with surfaces sorted by decreasing area (largest branches first)."""
+    if formula not in FORMULAS:
+        raise ValueError(f'Unknown formula {formula!r}; expected one of {FORMULAS}.')
+    names = list(catalogue)
+    alphas = np.array([np.asarray(catalogue[n]['alphas'], dtype=np.float64) for n in names])  # [materials, bands]
+    target = np.asarray(target, dtype=np.float64)
+    if alphas.shape[-1] != target.shape[-1]:
+        raise ValueError(f'Materials have {alphas.shape[-1]} bands, the target has {target.shape[-1]}.')
+    tolerance = np.broadcast_to(0.1 * target if tolerance is None else np.asarray(tolerance, float), target.shape)
+
+    areas = np.asarray(surfaces, dtype=np.float64)
+    allowed_mask = np.ones((len(areas), len(names)), dtype=bool)
+    for s, materials in (allowed or {}).items():
+        allowed_mask[s] = np.isin(names, list(materials))
+    if not allowed_mask.any(axis=-1).all():
+        raise ValueError('Every surface needs at least one allowed material.')
+
+    order = np.argsort(-areas, kind='stable')
+    if formula == 'millington':
+        contributions = -areas[order, None, None] * np.log(1 - alphas)  # [surfaces, materials, bands]
+    else:
+        contributions = areas[order, None, None] * alphas
+    return {
+        'volume': float(volume),
+        'areas': areas,
+        'order': order,
+        'names': names,
+        'alphas': alphas,
+        'costs': areas[order, None] * np.array([float(catalogue[n].get('cost', 0.0)) for n in names]),
+        'limits': np.array([float(catalogue[n].get('max_area', np.inf)) for n in names]),
+        'allowed': allowed_mask[order],
+        'contributions': contributions,
+        'target': target,
+        'tolerance': tolerance,
+        'formula': formula,
+        'decay': decay,
+        'c': c,
+    }
+
+
+def _rt_from_sum(p: dict, q):
+    """RT of the bounded formulas from their sum over surfaces (S·α, or -S·ln(1-α) for Millington) [s]."""
+    constant = room.rt_constant(p['c'], p['decay']) * p['volume']
+    if p['formula'] == 'eyring':
+        s_tot = p['areas'].sum()
+        with np.errstate(divide='ignore'):  # Fully absorbing room
+            return constant / (-s_tot * np.log(1 - np.minimum(q / s_tot, 1)))
+    return constant / q
+
+
+def _pareto(dev, cost, *others):
+    """Solutions not dominated in (deviation, cost), sorted by cost."""
+    ranked = np.lexsort((dev, cost))
+    dev, cost = dev[ranked], cost[ranked]
+    keep = dev < np.minimum.accumulate(np.concatenate([[np.inf], dev[:-1]]))  # Better than every cheaper one
+    return (dev[keep], cost[keep]) + tuple(x[ranked][keep] for x in others)
+
+
+def _search(p: dict, prefixes: list, deadline: float, batch_size: int) -> dict:
+    """
+    Depth-first branch-and-bound over material assignments, starting from each prefix (materials
+    of the first surfaces), enumerating the last surfaces in vectorized batches.
+    """
+    n_surfaces, n_materials = p['allowed'].shape
+    choices = [np.flatnonzero(a) for a in p['allowed']]
+    bounded = p['formula'] in BOUNDED_FORMULAS
+    rt_formula = getattr(room, f'rt_{p["formula"]}')
+    inverse = np.argsort(p['order'])
+
+    # Surfaces from leaf on are enumerated all at once; the first one is fixed by the prefixes
+    leaf = n_surfaces
+    while leaf > 1 and np.prod([len(c) for c in choices[leaf - 1 :]]) <= batch_size:
+        leaf -= 1
+    combos = np.array(list(itertools.product(*choices[leaf:])), dtype=np.intp).reshape(-1, n_surfaces - leaf)
+    combo_cost = np.zeros(len(combos))
+    combo_area = np.zeros((len(combos), n_materials))
+    for j, s in enumerate(range(leaf, n_surfaces)):
+        combo_cost += p['costs'][s, combos[:, j]]
+        np.add.at(combo_area, (np.arange(len(combos)), combos[:, j]), p['areas'][p['order'][s]])
+
+    # Bounds of what the remaining surfaces can add, from each depth on
+    q_min = np.array([p['contributions'][s, c].min(axis=0) for s, c in enumerate(choices)])
+    q_max = np.array([p['contributions'][s, c].max(axis=0) for s, c in enumerate(choices)])
+    cost_min = np.array([p['costs'][s, c].min() for s, c in enumerate(choices)])
+    remaining_q_min = np.cumsum(q_min[::-1], axis=0)[::-1]
+    remaining_q_max = np.cumsum(q_max[::-1], axis=0)[::-1]
+    remaining_cost = np.concatenate([np.cumsum(cost_min[::-1])[::-1], [0.0]])
+
+    archive = (np.empty(0), np.empty(0), np.empty((0, n_surfaces), dtype=np.intp), np.empty((0, len(p['target']))))
+    evaluated = pruned = 0
+    complete = True
+    stack = []
+    for prefix in prefixes:
+        used = np.zeros(n_materials)
+        np.add.at(used, list(prefix), p['areas'][p['order'][: len(prefix)]])
+        q = sum((p['contributions'][s, m] for s, m in enumerate(prefix)), np.zeros(len(p['target'])))
+        stack.append((tuple(prefix), q, sum(p['costs'][s, m] for s, m in enumerate(prefix)), used))
+    stack.reverse()
+
+    while stack:
+        if time.time() > deadline:
+            complete = False
+            break
+        prefix, q, cost, used = stack.pop()
+        depth = len(prefix)
+
+        # Lower bounds of the deviation and cost of every completion of this prefix
+        lower_cost = cost + remaining_cost[depth]
+        lower_dev = 0.0
+        if bounded and depth < n_surfaces:
+            rt_low = _rt_from_sum(p, q + remaining_q_max[depth])
+            rt_high = _rt_from_sum(p, q + remaining_q_min[depth])
+            gap = np.maximum(np.maximum(rt_low - p['target'], p['target'] - rt_high), 0)
+            lower_dev = np.max(gap / p['tolerance'])
+        if np.any((archive[0] <= lower_dev) & (archive[1] <= lower_cost)):
+            pruned += 1
+            continue
+
+        if depth < leaf:
+            s = depth
+            children = [m for m in choices[s] if used[m] + p['areas'][p['order'][s]] <= p['limits'][m]]
+            for m in sorted(children, key=lambda m: -p['costs'][s, m]):  # Cheapest popped first
+                child_used = used.copy()
+                child_used[m] += p['areas'][p['order'][s]]
+                stack.append((prefix + (m,), q + p['contributions'][s, m], cost + p['costs'][s, m], child_used))
+            continue
+
+        feasible = np.all(used + combo_area <= p['limits'], axis=-1)
+        assignment = np.hstack([np.broadcast_to(prefix, (len(combos), depth)), combos])[feasible]
+        evaluated += len(assignment)
+        if not len(assignment):
+            continue
+        alphas = np.swapaxes(p['alphas'][assignment[:, inverse]], 1, 2)  # [solutions, bands, surfaces] in room order
+        rt = rt_formula(p['volume'], p['areas'], alphas, p['decay'], p['c'])
+        dev = np.max(np.abs(rt - p['target']) / p['tolerance'], axis=-1)
+        batch = _pareto(dev, cost + combo_cost[feasible], assignment, rt)
+        archive = _pareto(*(np.concatenate([a, b]) for a, b in zip(archive, batch)))
+
+    return {'archive': archive, 'evaluated': evaluated, 'pruned': pruned, 'complete': complete}
+
+
+def optimize_treatment(
+    volume: float,
+    surfaces: list,
+    target: list,
+    catalogue: dict,
+    tolerance=None,
+    formula: str = 'eyring',
+    allowed: dict = None,
+    budget: float = 10.0,
+    workers: int = None,
+    batch_size: int = 65536,
+    decay: int = 60,
+    c: float = 343.0,
+) -> dict:
+    """
+    Search for the treatments (one material per surface) that best meet a target reverberation
+    time at every band, at the lowest cost.
+
+    Assignments are explored with a depth-first branch-and-bound: the materials of the largest
+    surfaces are chosen one at a time, and the last surfaces are enumerated in vectorized
+    batches. A partial assignment is pruned when a solution already found is at least as close
+    to the target and as cheap as any of its completions can be (deviation bounds are exact
+    for Sabine, Eyring and Millington; for Fitzroy and Arau only the cost bound prunes).
+    The first surface's materials are split across worker processes.
+
+    Parameters:
+        volume (float): Total volume of the room [m3]
+        surfaces (list of floats): Surface area of each boundary [m2]
+            ex: utils.shoebox_surfaces(10, 7, 4) (needed for Fitzroy and Arau)
+        target (list): Target reverberation time of each band [s]
+        catalogue (dict): Candidate materials, keyed by name, as dicts with 'alphas' (absorption
+            coefficient of each band), 'cost' (per m2) [default: 0] and 'max_area' (total area
+            the material can cover) [m2] [default: unlimited]
+        tolerance (float or list): Accepted deviation from the target at each band [s];
+            [default: 10% of the target]
+        formula (string): Reverberation formula; sabine, eyring, millington, fitzroy or arau
+        allowed (dict): Materials allowed on some surfaces, as surface index: list of names;
+            [default: every material on every surface]
+        budget (float): Time budget [s]; the best solutions found so far are returned when it runs out
+        workers (int): Number of worker processes; [default: number of CPUs]
+            1 runs the search in the current process
+        batch_size (int): Maximum number of assignments evaluated at once
+        decay (int): intensity drop for computing reverberation time [dB]
+        c (float): speed of sound [m/s]
+
+    Returns:
+        results (dict):
+            solutions: Pareto-best solutions in deviation and cost, sorted by cost, as dicts with
+                'materials' (name for each surface), 'rt' (each band) [s], 'cost', 'deviation'
+                (largest deviation from the target, as a fraction of the tolerance) and
+                'within_tolerance' (deviation of at most 1 at every band)
+            complete (bool): Whether the whole space was searched within the budget
+            evaluated (int): Number of complete assignments evaluated
+            pruned (int): Number of partial assignments pruned
+    """
+    p = _problem(volume, surfaces, target, tolerance, catalogue, formula, allowed, decay, c)
+    deadline = time.time() + budget
+    workers = workers or os.cpu_count()
+    first = [(m,) for m in np.flatnonzero(p['allowed'][0])]
+
+    if workers == 1 or len(first) == 1:
+        outcomes = [_search(p, first, deadline, batch_size)]
+    else:
+        tasks = [first[i::workers] for i in range(min(workers, len(first)))]
+        with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+            outcomes = list(executor.map(_search, *zip(*((p, t, deadline, batch_size) for t in tasks))))
+
+    archive = [np.concatenate(parts) for parts in zip(*(o['archive'] for o in outcomes))]
+    dev, cost, assignment, rt = _pareto(*archive)
+    inverse = np.argsort(p['order'])
+    solutions = [
+        {
+            'materials': [p['names'][m] for m in a[inverse]],
+            'rt': r.tolist(),
+            'cost': float(k),
+            'deviation': float(d),
+            'within_tolerance': bool(d <= 1),
+        }
+        for d, k, a, r in zip(dev, cost, assignment, rt)
+    ]
+    return {
+        'solutions': solutions,
+        'complete': all(o['complete'] for o in outcomes),
+        'evaluated': sum(o['evaluated'] for o in outcomes),
+        'pruned': sum(o['pruned'] for o in outcomes),
+    }
@@ -0,0 +1,197 @@
+"""
+PROFILING
+
+This module contains hooks for timing the stages of the impulse-response analysis
+(file reading, filter design, filtering, integration...) and exporting the records.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_active = None  # Profiler recording the stages, None while profiling is disabled
+_disabled = contextlib.nullcontext()
+_inherited = contextvars.ContextVar('acoustician_tools_tags', default={})  # Tags of enclosing tagged blocks
+
+
+def stage(name: str, **tags):
+    """
+    Mark a stage of the analysis, as a context manager.
+
+    While no Profiler is active this returns a shared no-op context, so instrumented code
+    only pays for one function call per stage.
+
+    Parameters:
+        name (string): Stage name (ex: 'read', 'filter', 'schroeder')
+        **tags: Values identifying the work (ex: band, source), kept with the record
+    """
+    profiler = _active
+    if profiler is None:
+        return _disabled
+    inherited = _inherited.get()
+    return _Stage(profiler, name, {**inherited, **tags} if inherited else tags)
+
+
+@contextlib.contextmanager
+def tagged(**tags):
+    """
+    Add tags to every stage started within a block, as a context manager, including stages
+    run in worker threads by filter.thread_map (see carry_tags).
+
+    Tags of enclosing blocks take precedence, so the outermost caller names the work
+    (ex: the file path given to analyze_ir, rather than its contents read for the cache).
+
+    Parameters:
+        **tags: Values identifying the work (ex: source)
+    """
+    token = _inherited.set({**tags, **_inherited.get()})
+    try:
+        yield
+    finally:
+        _inherited.reset(token)
+
+
+def carry_tags(func):
+    """Wrap a function to be run in another thread, so its stages keep the tags of the calling block."""
+    inherited = _inherited.get()
+    if not inherited:
+        return func
+
+    def run(*args, **kwargs):
+        token = _inherited.set(inherited)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _inherited.reset(token)
+
+    return run
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'tags', 'start', 'memory')
+
+    def __init__(self, profiler, name: str, tags: dict):
+        self.profiler, self.name, self.tags = profiler, name, tags
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0] if self.profiler.memory else 0
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        allocated = tracemalloc.get_traced_memory()[0] - self.memory if self.profiler.memory else None
+        self.profiler._record(self.name, self.tags, self.start, end, allocated)
+
+
+class Profiler:
+    """
+    Record the wall time, number of calls and memory allocated by each stage of the analysis
+    (see the stage names in rir and filter), while used as a context manager.
+
+    Stages run in worker threads are recorded too, with their thread; stages run in other
+    processes (ex: batch.analyze_batch workers) are not. Stages may nest (ex: 'truncation'
+    within 'schroeder'), so their times do not add up to the total. Every stage of an
+    analysis is tagged with the source it reads (see tagged), so the records of several
+    files can be told apart (ex: summary(by='source')).
+
+    Parameters:
+        memory (bool): Also record the memory each stage leaves allocated (net change of the
+            memory traced by tracemalloc, which slows the analysis down); with several threads
+            running, stages overlapping in time share each other's allocations
+        callback (callable): Called with each record (dict), as soon as its stage ends
+
+    Usage:
+        with Profiler() as profiler:
+            analyze_ir('ir.wav', bands)
+        profiler.summary(by='band')
+        profiler.to_chrome_trace('trace.json')  # Open in chrome://tracing or ui.perfetto.dev
+    """
+
+    def __init__(self, memory: bool = False, callback=None):
+        self.memory = memory
+        self.callback = callback
+        self.records = []
+        self._origin = time.perf_counter_ns()
+        self._previous = None
+        self._tracing = False
+
+    def __enter__(self):
+        global _active
+        self._previous, _active = _active, self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _record(self, name: str, tags: dict, start: int, end: int, allocated: int):
+        record = {
+            'name': name,
+            'start': (start - self._origin) / 1e9,
+            'duration': (end - start) / 1e9,
+            'thread': threading.get_ident(),
+            'tags': tags,
+            'memory': allocated,
+        }
+        self.records.append(record)
+        if self.callback:
+            self.callback(record)
+
+    def summary(self, by: str = None) -> dict:
+        """
+        Totals for each stage.
+
+        Parameters:
+            by (string): Tag to break the totals down by (ex: 'band', 'source')
+
+        Returns:
+            summary (dict): Keyed by stage name, or by (stage name, tag value) with 'by';
+                values are dicts with 'calls', 'time' and 'max_time' [s], and 'memory' [bytes]
+        """
+        summary = {}
+        for r in self.records:
+            key = r['name'] if by is None else (r['name'], _hashable(r['tags'].get(by)))
+            totals = summary.setdefault(key, {'calls': 0, 'time': 0.0, 'max_time': 0.0, 'memory': 0})
+            totals['calls'] += 1
+            totals['time'] += r['duration']
+            totals['max_time'] = max(totals['max_time'], r['duration'])
+            totals['memory'] += r['memory'] or 0
+        return summary
+
+    def to_json(self, path: str):
+        """Write the summary and every record to a JSON file."""
+        report = {'summary': self.summary(), 'records': self.records}
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+
+    def to_chrome_trace(self, path: str):
+        """Write the records as a Chrome trace-format file (complete events, in microseconds)."""
+        events = [
+            {
+                'name': r['name'],
+                'cat': 'acoustician_tools',
+                'ph': 'X',
+                'ts': r['start'] * 1e6,
+                'dur': r['duration'] * 1e6,
+                'pid': os.getpid(),
+                'tid': r['thread'],
+                'args': {**r['tags'], 'memory': r['memory']},
+            }
+            for r in self.records
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
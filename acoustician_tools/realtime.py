@@ -0,0 +1,327 @@
+"""
+REALTIME
+
+This module contains a stateful analyzer for monitoring band levels, decay times and
+energy parameters from live audio, one block at a time.
+"""
+
+import numpy as np
+from acoustician_tools.filter import butter_filterbank, butter_filterbank_blocks
+from acoustician_tools.rir import (
+    DECAY_FILTER_ORDER,
+    _as_float,
+    _decay_range,
+    _energy_params,
+    _onset_index,
+    _parse_metric,
+    _rt_from_schroeder,
+    _schroeder_db,
+    _trim_onset,
+    _truncated_schroeder_db,
+)
+
+
+class RealtimeAnalyzer:
+    """
+    Stateful analyzer of a live impulse or interrupted-noise feed, consuming fixed-size audio blocks.
+
+    Each block is filtered through the bandpass filterbank, carrying the filter state from
+    one block to the next, and gives a level update for every band. Decay events are detected
+    as the blocks arrive and recorded into buffers of 'duration' seconds allocated once, so
+    memory does not grow with the length of the feed. An event is analysed as soon as its
+    buffer is full (or the feed is flushed), so its update is emitted at most 'duration'
+    seconds plus one block after the event started.
+
+    Impulse mode: an event starts when a sample reaches trigger_db, and is recorded from one
+    block before it, since the onset of an impulse peaking less than -onset_db above
+    trigger_db comes before the trigger. Its raw samples are trimmed at the onset of the
+    recording, the first sample within onset_db of its peak, and filtered again from there
+    with fresh filter state, so its parameters match those of rir.analyze_ir with onset_db
+    (the live filters also ring with the samples before the onset, which shifts the early
+    energy of low bands).
+
+    Noise mode: an event starts when the level of a block falls trigger_db below the steady
+    level of the noise, and the next event waits until the noise starts again. Decay times
+    are regressed on the smoothed band energy relative to its steady level, from the point
+    the noise stopped. A single noise decay fluctuates too much near its start for EDT, and
+    energy parameters need an impulse, so only decay times from -5dB are available.
+
+    Parameters:
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        sr (int): Sample rate [Hz]
+        metrics (list): Parameters to be calculated, as accepted by rir.analyze_ir
+        mode (string): Type of feed; [impulse, noise]
+        duration (float): Length of the recorded events [s]
+        trigger_db (float): Impulse mode: level that starts an event [dBFS]; [default: -30]
+            Noise mode: drop below the steady level that starts an event [dB]; [default: 3]
+        onset_db (float): Impulse mode: onset level relative to the event peak [dB]
+        truncate (bool): Leave the noise floor of each band out of the parameters (see rir.lundeby_truncation)
+        smoothing (float): Noise mode: length of the moving average of the band energy [ms]
+        callback (callable): Called with each update, as it is emitted
+        workers (int or Executor): Threads filtering bands concurrently (see filter.thread_map)
+    """
+
+    def __init__(
+        self,
+        bands: list,
+        sr: int,
+        metrics: list = ('c50', 'c80', 'd50', 'edt', 't20', 't30'),
+        mode: str = 'impulse',
+        duration: float = 3.0,
+        trigger_db: float = None,
+        onset_db: float = -20,
+        truncate: bool = False,
+        smoothing: float = 10,
+        callback=None,
+        workers=None,
+    ):
+        if mode not in ('impulse', 'noise'):
+            raise ValueError('Invalid mode. Only valid options are "impulse" and "noise".')
+        self.parsed = {str.lower(str(m)): _parse_metric(m) for m in metrics}
+        if mode == 'noise' and any(p[0] != 'decay' or p[1] == 'edt' for p in self.parsed.values()):
+            raise ValueError('Only decay times from -5dB (t10, t20, t30, t60) are available in noise mode.')
+
+        self.bands = bands
+        self.sr = sr
+        self.mode = mode
+        self.capacity = int(duration * sr)
+        self.trigger_db = trigger_db if trigger_db is not None else (-30 if mode == 'impulse' else 3)
+        self.onset_db = onset_db
+        self.truncate = truncate
+        self.smoothing = max(int(smoothing / 1000 * sr), 1)
+        self.callback = callback
+        self.workers = workers
+        self.reset()
+
+    def reset(self):
+        """Drop the filter state, the steady level and any event being recorded."""
+        self.time = 0  # Samples consumed
+        self._banks = None
+        self._buffers = None
+        self._start = None  # Sample where the event being recorded starts
+        self._recorded = 0
+        self._end = self.capacity  # Samples of the event being recorded, with its lookback
+        self._armed = True
+        self._steady = None  # Noise mode: steady energy of the signal and of each band
+        self._quiet = None  # Noise mode: lowest energy since the last event, until the noise starts again
+        self._previous = None  # Previous block, raw and filtered
+
+    def _feed(self):
+        while True:
+            yield self._block
+
+    def _open(self, channels: int):
+        """Create the filterbank and allocate the event buffers, once the channel count is known."""
+        self._banks = {
+            'decay': butter_filterbank_blocks(
+                self._feed(), self.bands, self.sr, order=DECAY_FILTER_ORDER, workers=self.workers
+            )
+        }
+        self._lookback = self._block.shape[-1] if self.mode == 'impulse' else 0  # One block before the trigger
+        self._buffers = {'raw': np.zeros((channels, self._lookback + self.capacity))}
+        if self.mode == 'noise':  # Impulse events are filtered again from their onset
+            self._buffers['decay'] = np.zeros((len(self.bands), channels, self.capacity))
+
+    def _emit(self, updates: list, update: dict):
+        updates.append(update)
+        if self.callback:
+            self.callback(update)
+
+    def _record(self, blocks: dict, start: int = 0) -> bool:
+        """Copy blocks from a sample index into the event buffers; True once they are full."""
+        n = min(blocks['raw'].shape[-1] - start, self._end - self._recorded)
+        for name, buffer in self._buffers.items():
+            buffer[..., self._recorded : self._recorded + n] = blocks[name][..., start : start + n]
+        self._recorded += n
+        return self._recorded == self._end
+
+    def process(self, block) -> list:
+        """
+        Analyse the next block of the feed.
+
+        Parameters:
+            block (np.array): Audio samples; [samples] or [samples, channels]
+                integer PCM is scaled to [-1, 1)
+
+        Returns:
+            updates (list): Updates emitted by this block (dict), each with a 'kind' and the
+                'time' it refers to [s]: a 'level' update with the band 'levels' of the block
+                [dBFS], and an 'event' update with the 'results' of each metric (as rir.analyze_ir)
+                when an event has been analysed
+        """
+        x = np.atleast_2d(_as_float(np.asarray(block)).T)  # One row per channel
+        self._block = x
+        if self._banks is None:
+            self._open(x.shape[0])
+        blocks = {'raw': x, **{name: next(bank) for name, bank in self._banks.items()}}
+        updates = []
+
+        with np.errstate(divide='ignore'):
+            levels = 10 * np.log10(np.mean(blocks['decay'] ** 2, axis=-1))
+        time = (self.time + x.shape[-1]) / self.sr
+        self._emit(updates, {'kind': 'level', 'time': time, 'levels': self._values(levels)})
+
+        if self.mode == 'impulse':
+            self._detect_impulse(blocks, updates)
+        else:
+            self._detect_cutoff(blocks, updates)
+        self._previous = blocks
+        self.time += x.shape[-1]
+        return updates
+
+    def _detect_impulse(self, blocks: dict, updates: list):
+        trigger = np.abs(blocks['raw']) >= 10 ** (self.trigger_db / 20)
+        if self._start is None:
+            if not trigger.any():
+                self._armed = True
+                return
+            if not self._armed:
+                return  # Tail of the previous event
+            i = int(np.argmax(trigger.any(axis=0)))
+            # Record from up to one block before the trigger, where the onset of a quiet impulse can lie
+            previous = self._previous['raw'] if self._previous is not None else blocks['raw'][:, :0]
+            lookback = np.concatenate([previous, blocks['raw'][:, :i]], axis=-1)[:, -self._lookback :]
+            self._start, self._recorded = self.time + i - lookback.shape[-1], 0
+            self._end = lookback.shape[-1] + self.capacity
+            self._record({'raw': lookback})
+            full = self._record(blocks, i)
+        else:
+            full = self._record(blocks)
+        if full:
+            self._finish(updates)
+            self._armed = not trigger.any()
+
+    def _detect_cutoff(self, blocks: dict, updates: list):
+        energy = {name: np.mean(blocks[name] ** 2, axis=-1) for name in ('raw', 'decay')}  # Per sample
+        drop = 10 ** (-self.trigger_db / 10)
+        if self._start is not None:
+            if self._record(blocks):
+                self._finish(updates)
+        elif self._quiet is not None:
+            # Waiting for the noise to start again after an event
+            self._quiet = np.minimum(self._quiet, energy['raw'])
+            if np.all(energy['raw'] * drop >= self._quiet):
+                self._quiet, self._steady = None, energy
+        elif self._steady is None:
+            self._steady = energy
+        elif np.any(energy['raw'] < self._steady['raw'] * drop):
+            # The noise stopped in this block; record from the start of the previous (steady) one
+            self._start, self._recorded = self.time - self._previous['raw'].shape[-1], 0
+            if self._record(self._previous) or self._record(blocks):
+                self._finish(updates)
+        else:
+            self._steady = {name: 0.8 * self._steady[name] + 0.2 * energy[name] for name in energy}
+
+    def flush(self) -> list:
+        """
+        Analyse the event being recorded, if any, with the samples received so far.
+
+        Returns:
+            updates (list): The event update, if there was one (see process)
+        """
+        updates = []
+        if self._start is not None and self._recorded > 1:
+            self._finish(updates)
+        return updates
+
+    def _finish(self, updates: list):
+        n = self._recorded
+        if self.mode == 'impulse':
+            onsets = _onset_index(self._buffers['raw'][:, :n], threshold_db=self.onset_db)
+            results = self._impulse_params(n)
+        else:
+            results, onsets = self._noise_params(n)
+        time = (self._start + onsets.min()) / self.sr
+        self._start = None
+        if self.mode == 'noise':
+            self._steady, self._quiet = None, np.full(onsets.shape, np.inf)
+        self._emit(updates, {'kind': 'event', 'time': time, 'results': results})
+
+    def _impulse_params(self, n: int) -> dict:
+        """Parameters of the recorded event, filtering its raw samples from the onset of each channel."""
+        raw = self._buffers['raw'][:, :n]
+        energy = {m: p for m, p in self.parsed.items() if p[0] != 'decay'}
+        ranges = {m: _decay_range(p[1]) for m, p in self.parsed.items() if p[0] == 'decay'}
+        values = {}
+        if energy:
+            options = {'workers': self.workers, 'onset_db': self.onset_db, 'truncate': self.truncate}
+            values.update(_energy_params(raw, self.bands, self.sr, energy, **options))
+        if ranges:
+            y, lengths = _trim_onset(raw, self.onset_db)
+            filtered = butter_filterbank(y, self.bands, self.sr, order=DECAY_FILTER_ORDER, workers=self.workers)
+            values.update({m: np.full(filtered.shape[:-1], np.nan) for m in ranges})
+            for b, c in np.ndindex(filtered.shape[:-1]):
+                ch = filtered[b, c, : lengths[c]]
+                sch_db = _truncated_schroeder_db(ch, self.sr) if self.truncate else _schroeder_db(ch)
+                for m, rt60 in zip(ranges, self._decay_times(sch_db, ranges.values())):
+                    values[m][b, c] = rt60
+        return {m: self._values(values[m]) for m in self.parsed}
+
+    def _smoothed_db(self, y, steady):
+        """Moving average of the energy of a signal, relative to its steady level [dB]."""
+        cumulative = np.cumsum(y**2, axis=-1)
+        cumulative[..., self.smoothing :] -= cumulative[..., : -self.smoothing].copy()
+        with np.errstate(divide='ignore'):
+            return 10 * np.log10(cumulative[..., self.smoothing - 1 :] / self.smoothing / steady[..., None])
+
+    def _noise_params(self, n: int) -> dict:
+        ranges = {m: _decay_range(p[1]) for m, p in self.parsed.items()}
+        broadband = self._smoothed_db(self._buffers['raw'][:, :n], self._steady['raw'])
+        curves = self._smoothed_db(self._buffers['decay'][..., :n], self._steady['decay'])
+
+        values = {m: np.full(curves.shape[:-1], np.nan) for m in ranges}
+        cutoffs = np.zeros(broadband.shape[0], dtype=int)
+        for c, level in enumerate(broadband):
+            steady = np.flatnonzero(level[: np.argmax(level <= -self.trigger_db)] >= -1)
+            cutoffs[c] = steady[-1] if len(steady) else 0  # Last point of the broadband level at the steady level
+            for b in range(len(self.bands)):
+                curve = curves[b, c, cutoffs[c] :]
+                for m, rt60 in zip(ranges, self._decay_times(curve, ranges.values(), monotonic=False)):
+                    values[m][b, c] = rt60
+        return {m: self._values(v) for m, v in values.items()}, cutoffs
+
+    def _decay_times(self, sch_db, ranges, monotonic: bool = True):
+        """RT60 for each range, NaN where the recorded decay does not reach its end."""
+        ranges = list(ranges)
+        try:
+            return _rt_from_schroeder(sch_db, self.sr, ranges, monotonic)
+        except ValueError:
+            rt60 = np.full(len(ranges), np.nan)
+            for k, r in enumerate(ranges):
+                if np.min(sch_db) <= r[0][1]:
+                    rt60[k] = _rt_from_schroeder(sch_db, self.sr, [r], monotonic)[0]
+            return rt60
+
+    def _values(self, values):
+        """Band values as lists, with one value per channel for multichannel feeds."""
+        return (values[:, 0] if values.shape[1] == 1 else values).tolist()
+
+    def close(self):
+        """Stop the filterbank, releasing its threads."""
+        for bank in (self._banks or {}).values():
+            bank.close()
+        self._banks = None
+
+
+def analyze_stream(blocks, bands: list, sr: int, metrics: list = ('c50', 'c80', 'd50', 'edt', 't20', 't30'), **options):
+    """
+    Analyse a live feed of audio blocks, yielding updates as they are emitted.
+
+    Parameters:
+        blocks (iterable): Consecutive audio blocks; [samples] or [samples, channels]
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        sr (int): Sample rate [Hz]
+        metrics (list): Parameters to be calculated, as accepted by rir.analyze_ir
+        **options: Other keyword arguments for RealtimeAnalyzer (ex: mode, duration)
+
+    Yields:
+        update (dict): Level and event updates (see RealtimeAnalyzer.process); the event
+            being recorded when the feed ends is analysed with the samples received
+    """
+    analyzer = RealtimeAnalyzer(bands, sr, metrics, **options)
+    try:
+        for block in blocks:
+            yield from analyzer.process(block)
+        yield from analyzer.flush()
+    finally:
+        analyzer.close()
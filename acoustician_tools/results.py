@@ -0,0 +1,274 @@
+"""
+RESULTS
+
+This module contains compact record arrays for analysis results, and a columnar on-disk
+store for collecting them across large measurement campaigns and querying them back
+without loading every result.
+"""
+
+import json
+import os
+import tempfile
+import numpy as np
+
+SHARD_PREFIX = 'shard-'
+
+
+def _column(values: list) -> np.ndarray:
+    """
+    Array of one column from row values; missing values (None) become NaN, or empty
+    strings in text columns, and lists are padded with NaN to the longest one.
+    """
+    if any(isinstance(v, str) for v in values):
+        return np.array(['' if v is None else str(v) for v in values])
+    if any(isinstance(v, (list, tuple, np.ndarray)) for v in values):
+        width = max(len(v) for v in values if v is not None)
+        column = np.full((len(values), width), np.nan)
+        for i, v in enumerate(values):
+            if v is not None:
+                column[i, : len(v)] = v
+        return column
+    return np.array([np.nan if v is None else v for v in values])
+
+
+def _table(columns: dict) -> np.recarray:
+    """Record array from a dict of equal-length columns, keeping multi-dimensional columns as subarrays."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    table = np.recarray(n, dtype=[(k, c.dtype, c.shape[1:]) for k, c in columns.items()])
+    for k, c in columns.items():
+        table[k] = c
+    return table
+
+
+def _flatten(row: dict, prefix: str = '') -> dict:
+    """Flatten nested dicts, joining keys with underscores (ex: high_cutoff_frequency_0°)."""
+    flat = {}
+    for k, v in row.items():
+        if isinstance(v, dict):
+            flat.update(_flatten(v, f'{prefix}{k}_'))
+        else:
+            flat[f'{prefix}{k}'] = v
+    return flat
+
+
+def records(rows: list) -> np.recarray:
+    """
+    Convert a list of dicts (ex: batch.analyze_batch rows, qrd_diffuser_parameters results)
+    into a record array, with one typed column per key.
+
+    Parameters:
+        rows (list): Dicts of scalars, strings, lists or nested dicts; nested dicts are
+            flattened into one column per key, and keys missing from a row are left empty
+
+    Returns:
+        table (np.recarray): One record per row; columns are read as table.name or table['name']
+    """
+    rows = [_flatten(r) for r in rows]
+    names = list(dict.fromkeys(k for r in rows for k in r))
+    return _table({k: _column([r.get(k) for r in rows]) for k in names})
+
+
+def rir_records(source: str, bands: list, results: dict, **tags) -> np.recarray:
+    """
+    Convert the results of rir.analyze_ir into a long-format record array, with one
+    record per metric, band and channel.
+
+    Parameters:
+        source (string): Name of the analysed impulse-response (ex: its path)
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        results (dict): Values keyed by metric name, as returned by rir.analyze_ir
+            (single or multichannel)
+        **tags: Constant columns added to every record (ex: seat='A12', position=3)
+
+    Returns:
+        table (np.recarray): Columns source, channel, band_low, band_high, metric, value,
+            followed by the tags
+    """
+    bands = np.asarray(bands, dtype=np.float64)
+    values = {m: np.asarray(v, dtype=np.float64) for m, v in results.items()}
+    values = {m: v[:, None] if v.ndim == 1 else v for m, v in values.items()}  # [bands, channels]
+    n_bands, n_channels = next(iter(values.values())).shape if values else (len(bands), 1)
+    n = len(values) * n_bands * n_channels
+
+    columns = {
+        'source': np.full(n, str(source)),
+        'channel': np.tile(np.arange(n_channels, dtype=np.int32), len(values) * n_bands),
+        'band_low': np.tile(np.repeat(bands[:, 0], n_channels), len(values)),
+        'band_high': np.tile(np.repeat(bands[:, 1], n_channels), len(values)),
+        'metric': np.repeat(np.array(list(values), dtype=str), n_bands * n_channels),
+        'value': np.concatenate([v.ravel() for v in values.values()]) if values else np.empty(0),
+    }
+    columns.update({k: np.full(n, v) for k, v in tags.items()})
+    return _table(columns)
+
+
+class ResultStore:
+    """
+    Append-only columnar store of result tables, kept in a directory of shards.
+
+    Each append writes a new shard, with one .npy file per column. Queries memory-map the
+    shards and only read the columns they filter on, then the selected rows of the columns
+    they return, so campaign-wide queries do not load every result. Several processes can
+    append to the same store.
+
+    Parameters:
+        path (string): Directory of the store; created if it does not exist
+
+    Usage:
+        store = ResultStore('campaign')
+        store.append_results('seat_A12.wav', bands, analyze_ir('seat_A12.wav', bands), seat='A12')
+        store.query(['source', 'value'], metric='t30', band=500)  # T30 at 500Hz for all seats
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def shards(self) -> list:
+        """Paths of the shards, in the order they were written."""
+        names = sorted(n for n in os.listdir(self.path) if n.startswith(SHARD_PREFIX))
+        return [os.path.join(self.path, n) for n in names]
+
+    @staticmethod
+    def _meta(shard: str) -> dict:
+        with open(os.path.join(shard, 'meta.json')) as f:
+            return json.load(f)
+
+    @property
+    def columns(self) -> list:
+        """Column names, set by the first append."""
+        shards = self.shards()
+        return self._meta(shards[0])['columns'] if shards else []
+
+    def __len__(self) -> int:
+        return sum(self._meta(s)['rows'] for s in self.shards())
+
+    def append(self, table) -> str:
+        """
+        Write a table as a new shard.
+
+        Parameters:
+            table (np.ndarray or dict): Record array (ex: from records or rir_records),
+                or dict of equal-length columns; columns must match those already stored
+
+        Returns:
+            shard (string): Path of the written shard
+        """
+        if isinstance(table, dict):
+            columns = {k: np.asarray(v) for k, v in table.items()}
+        else:
+            columns = {k: np.asarray(table[k]) for k in table.dtype.names}
+        rows = {len(c) for c in columns.values()}
+        if len(rows) > 1:
+            raise ValueError('Columns must all have the same length.')
+        if self.columns and list(columns) != self.columns:
+            raise ValueError(f'Columns {list(columns)} do not match the stored columns {self.columns}.')
+
+        shards = self.shards()
+        index = int(os.path.basename(shards[-1])[len(SHARD_PREFIX) :]) + 1 if shards else 0
+        tmp = tempfile.mkdtemp(prefix='.tmp-', dir=self.path)  # Renamed to a shard once complete
+        for k, c in columns.items():
+            np.save(os.path.join(tmp, f'{k}.npy'), c, allow_pickle=False)
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump({'rows': rows.pop() if rows else 0, 'columns': list(columns)}, f)
+        while True:  # Another process may take the same index first
+            shard = os.path.join(self.path, f'{SHARD_PREFIX}{index:06d}')
+            try:
+                os.rename(tmp, shard)
+                return shard
+            except OSError:
+                if not os.path.exists(shard):
+                    raise
+                index += 1
+
+    def append_results(self, source: str, bands: list, results: dict, **tags) -> str:
+        """Append the results of rir.analyze_ir as a new shard (see rir_records)."""
+        return self.append(rir_records(source, bands, results, **tags))
+
+    @staticmethod
+    def _load(shard: str, name: str) -> np.ndarray:
+        return np.load(os.path.join(shard, f'{name}.npy'), mmap_mode='r')
+
+    def column(self, name: str) -> np.ndarray:
+        """All values of one column, across every shard."""
+        if name not in self.columns:
+            raise KeyError(f'Unknown column {name!r}; available columns are {self.columns}.')
+        return np.concatenate([self._load(s, name) for s in self.shards()])
+
+    def query(self, columns: list = None, band: float = None, **where) -> np.recarray:
+        """
+        Select records matching every condition.
+
+        Parameters:
+            columns (list): Columns to return; [default: all columns]
+            band (float): Keep the bands containing this frequency [Hz] (needs band_low and band_high)
+            **where: Conditions on columns, as a value, a list of accepted values, or a
+                function taking the column and returning a boolean mask (ex: value=lambda v: v > 1)
+
+        Returns:
+            table (np.recarray): Matching records
+        """
+        columns = list(columns or self.columns)
+        unknown = (set(columns) | set(where)) - set(self.columns)
+        if unknown:
+            raise KeyError(f'Unknown columns {sorted(unknown)}; available columns are {self.columns}.')
+
+        selected = {k: [] for k in columns}
+        for shard in self.shards():
+            mask = np.ones(self._meta(shard)['rows'], dtype=bool)
+            if band is not None:
+                mask &= (self._load(shard, 'band_low') <= band) & (band < self._load(shard, 'band_high'))
+            for k, condition in where.items():
+                values = self._load(shard, k)
+                if callable(condition):
+                    mask &= condition(values)
+                elif isinstance(condition, (list, tuple, set)):
+                    mask &= np.isin(values, list(condition))
+                else:
+                    mask &= values == condition
+            rows = np.flatnonzero(mask)
+            for k in columns:
+                selected[k].append(self._load(shard, k)[rows])
+        return _table({k: np.concatenate(v) if v else np.empty(0) for k, v in selected.items()})
+
+    def compact(self) -> str:
+        """
+        Merge every shard into a single one, returning its path.
+
+        The merged shard is written before the others are removed; no other process should
+        append to the store meanwhile.
+        """
+        shards = self.shards()
+        if len(shards) < 2:
+            return shards[0] if shards else None
+        merged = self.append({k: self.column(k) for k in self.columns})
+        for shard in shards:
+            for name in os.listdir(shard):
+                os.remove(os.path.join(shard, name))
+            os.rmdir(shard)
+        return merged
+
+    def to_parquet(self, path: str, columns: list = None):
+        """
+        Export the store to a Parquet file, one row group per shard (requires pyarrow).
+
+        Parameters:
+            path (string): Parquet file to write
+            columns (list): Columns to export; [default: all columns]
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Parquet export requires pyarrow (pip install pyarrow).') from None
+
+        columns = list(columns or self.columns)
+        writer = None
+        try:
+            for shard in self.shards():
+                batch = pa.table({k: np.asarray(self._load(shard, k)) for k in columns})
+                writer = writer or pq.ParquetWriter(path, batch.schema)
+                writer.write_table(batch)
+        finally:
+            if writer is not None:
+                writer.close()
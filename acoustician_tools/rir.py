@@ -5,87 +5,293 @@ This module contains functions for loading and processing room impulse-responses
 and make various acoustical calculations.
 """
 
+import io
+import os
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from scipy.io import wavfile
-from scipy.stats import linregress
-from acoustician_tools.filter import butter_bandpass, butter_bandpass_filter
+from acoustician_tools.filter import (
+    butter_bandpass,
+    butter_bandpass_filter,
+    butter_filterbank,
+    butter_filterbank_blocks,
+    multirate_filterbank,
+    thread_map,
+)
+from acoustician_tools.cache import content_digest
+from acoustician_tools.profiling import stage, tagged
 
+ENERGY_FILTER_ORDER = 5  # Bandpass filter order for clarity and definition
+DECAY_FILTER_ORDER = 8  # Bandpass filter order for decay times
 
-def clarity_from_ir(path: str, bands: list, t_early: int = 50):
+
+def _as_float(y):
     """
-    Calculate clarity parameter from an impulse-response in .wav format.
+    Convert integer PCM samples to float values in the [-1, 1) range.
+
+    Float arrays are returned as they are, without copying them when they are contiguous.
+    """
+    y = np.asarray(y)
+    match y.dtype.kind:
+        case 'f':
+            return np.ascontiguousarray(y)
+        case 'u':
+            half = 2 ** (8 * y.dtype.itemsize - 1)  # Unsigned PCM is offset by half the range
+            return (y.astype(np.float64) - half) / half
+        case 'i':
+            return y.astype(np.float64) / 2 ** (8 * y.dtype.itemsize - 1)
+        case _:
+            raise TypeError(f'Unsupported sample type: {y.dtype}.')
+
+
+def _source_name(source) -> str:
+    """Short description of an impulse-response source, for tagging profiled stages."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return type(source).__name__
+
+
+def _read_ir(source, mmap: bool = False):
+    """
+    Load an impulse-response from a .wav file, a file-like object, bytes or an array.
 
     Parameters:
-        path (string): Path to file. Must be a .wav audio file containing
-            an impulse-response. Can be any bit sample-rate and bit depth
-        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
-        t_early (int): Early time limit for early/late energy; [ms]
-            (50ms for C50 and 80ms for C80 standards)
+        source (string, path, bytes, file-like or tuple): .wav file path, .wav file
+            contents, an open binary .wav file, or a tuple (samples, sample rate)
+        mmap (bool): Memory-map the samples of a .wav file path instead of loading them;
+            samples are then left in their stored format
 
     Returns:
-        clarity (list): List containing clarity values for each band
+        sr (int): Sample rate [Hz]
+        y (np.array): Impulse-response samples, as float values unless memory-mapped
     """
-    sr, y = wavfile.read(path)
-    start = np.where(y > 0)[0][0]  # First non-zero value
-    y = y[start:]  # Remove leading zeroes
-    t = int((t_early / 1000) * sr)
+    if isinstance(source, tuple):
+        y, sr = source
+        return sr, _as_float(y)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    if hasattr(source, 'read'):
+        sr, y = wavfile.read(source)
+    else:
+        sr, y = wavfile.read(source, mmap=mmap)
+        if mmap:
+            return sr, y
+    return sr, _as_float(y)
 
-    clarity = []
-    for b in bands:
-        y_filter = butter_bandpass_filter(y, b[0], b[1], sr, order=5)  # Bandpassed signal
-        y_sq = y_filter**2
-        c = 10 * np.log10(np.sum(y_sq[:t]) / np.sum(y_sq[t:]))
-        clarity.append(c)
-    return np.round(clarity, decimals=6).tolist()
 
+def _blocks(y, block_size: int, start: int = 0, onsets=None):
+    """
+    Split an impulse-response into float blocks along its last axis.
 
-def definition_from_ir(path: str, bands: list, t_early: int = 50):
+    Samples of each channel before its onset index (if given) are set to zero.
     """
-    Calculate definition parameter from an impulse-response in .wav format.
+    for a in range(start, y.shape[-1], block_size):
+        block = _as_float(y[..., a : a + block_size])
+        if onsets is not None:
+            index = a + np.arange(block.shape[-1])
+            block = np.where(index < onsets[:, None], 0.0, block)
+        yield block
+
+
+def _onset_index(y, block_size: int = 65536, threshold_db: float = None):
+    """
+    Onset index of each channel of an impulse-response, scanning block by block and
+    stopping once every channel has been found.
+
+    Without a threshold, the onset is the first positive value. With a threshold, it is
+    the first sample whose magnitude reaches that level relative to the channel's peak
+    (ISO 3382-1 uses -20dB); the peak is found with a running maximum, without
+    allocating an index array the size of the signal.
+
+    Returns:
+        onsets (np.array): Onset index of each channel; [channels]
+    """
+    level = np.zeros(y.shape[0])
+    if threshold_db is not None:
+        for start in range(0, y.shape[-1], block_size):
+            level = np.maximum(level, np.max(np.abs(_as_float(y[:, start : start + block_size])), axis=-1))
+        level *= 10 ** (threshold_db / 20)
+
+    onsets = np.full(y.shape[0], -1)
+    for start in range(0, y.shape[-1], block_size):
+        block = _as_float(y[:, start : start + block_size])
+        if threshold_db is None:
+            positive = block > 0
+        else:
+            positive = (np.abs(block) >= level[:, None]) & (level[:, None] > 0)
+        found = (onsets < 0) & positive.any(axis=-1)
+        onsets[found] = start + np.argmax(positive[found], axis=-1)
+        if (onsets >= 0).all():
+            return onsets
+    raise ValueError('The impulse-response contains no positive values.')
+
+
+def ir_onset(y, threshold_db: float = -20):
+    """
+    Find the onset of an impulse-response, as the first sample reaching a level relative to its peak.
 
     Parameters:
-        path (string): Path to file. Must be a .wav audio file containing
-            an impulse-response. Can be any bit sample-rate and bit depth
-        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
-        t_early (int): Early time limit for early/total energy; [ms]
-            (50ms for D50 and 80ms for D80 standards)
+        y (np.array): Impulse-response; [samples] or [samples, channels]
+        threshold_db (float): Onset level relative to the peak magnitude [dB]
+            (ISO 3382-1 places the onset no more than 20dB below the peak)
+            None takes the first positive value
 
     Returns:
-        definition (list): List containing definition values for each band
+        onset (int or np.array): Index of the onset sample (of each channel)
     """
-    sr, y = wavfile.read(path)
-    start = np.where(y > 0)[0][0]  # First non-zero value
-    y = y[start:]  # Remove leading zeroes
-    t = int((t_early / 1000) * sr)
+    y = np.asarray(y)
+    onsets = _onset_index(np.atleast_2d(y.T), threshold_db=threshold_db)
+    return int(onsets[0]) if y.ndim == 1 else onsets
 
-    definition = []
-    for b in bands:
-        y_filter = butter_bandpass_filter(y, b[0], b[1], sr, order=5)  # Bandpassed signal
-        y_sq = y_filter**2
-        d = 10 * np.log10(np.sum(y_sq[:t]) / np.sum(y_sq))
-        definition.append(d)
-    return np.round(definition, decimals=6).tolist()
 
+def _trim_onset(y, threshold_db: float = None):
+    """
+    Remove leading samples before the onset of each channel of an impulse-response.
+
+    Channels are left-aligned to their own onset and padded with zeroes to the longest one.
+
+    Parameters:
+        threshold_db (float): Onset level relative to the peak, as in _onset_index;
+            None takes the first positive value
 
-def rt60_from_ir(path: str, bands: list, estimator: str = 't30'):
+    Returns:
+        y (np.array): Trimmed impulse-response; [channels, samples]
+        lengths (np.array): Number of samples of each channel after its onset; [channels]
     """
-    Get RT60 from a .wav impulse-response file.
+    with stage('onset', channels=y.shape[0]):
+        onsets = _onset_index(y, threshold_db=threshold_db)
+        lengths = y.shape[-1] - onsets
+        if (onsets == onsets[0]).all():
+            return y[:, onsets[0] :], lengths
+
+        trimmed = np.zeros((y.shape[0], lengths.max()))
+        for c, start in enumerate(onsets):
+            trimmed[c, : lengths[c]] = y[c, start:]
+        return trimmed, lengths
+
+
+def _scaled_length(length: int, sr: int, fs: int) -> int:
+    """Number of samples at sample rate fs covering a length given at sample rate sr."""
+    return int(np.ceil(length * fs / sr))
+
+
+def _mask_tail(y_sq, lengths, sr: int, fs: int):
+    """Zero the energy of each channel past its trimmed length (filter ringing over the padding)."""
+    for c, length in enumerate(lengths):
+        y_sq[..., c, _scaled_length(length, sr, fs) :] = 0
+    return y_sq
+
+
+def lundeby_truncation(y_sq, sr: int, interval: float = 10, max_iterations: int = 5):
+    """
+    Estimate the noise floor and truncation point of a bandpassed impulse-response,
+    with Lundeby's iterative method.
+
+    The squared response is averaged in short intervals, and a first decay line is fitted
+    from the peak down to 10dB above the noise of the last 10% of the response. Each
+    iteration then re-averages the response in intervals of about 2dB of decay, measures
+    the noise from 10dB of decay past the crosspoint (or the last 10%), and fits the late
+    decay from 25dB to 5dB above it, until the crosspoint between the decay line and the
+    noise floor settles.
 
     Parameters:
-        path (string): Path to file. Must be a .wav audio file containing
-            an impulse-response. Can be any bit sample-rate and bit depth
-        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
-            Usually, RT60 is calculated using octave or third-octave bands
-        estimator (string): Measurement range to be used to determine the RT60 using
-            only a limited dynamic-range. [edt, t20, t30, t60]
+        y_sq (np.array): Squared, bandpassed impulse-response; [samples]
+        sr (int): Sample rate [Hz]
+        interval (float): Length of the initial averaging intervals [ms]
+        max_iterations (int): Maximum number of refinements of the crosspoint
 
     Returns:
-        rt60 (list): List containing RT60 values for each frequency band [s]
+        crosspoint (int): Index where the late decay meets the noise floor; samples from
+            it on are noise (the length of the response if no noise floor is found)
+        noise_db (float): Noise floor level, relative to the peak energy [dB]
+        tail (float): Energy the late decay would add past the crosspoint without noise,
+            for compensating integrals truncated there
+    """
+    n = y_sq.shape[-1]
+    peak = np.max(y_sq)
+
+    def envelope(width):
+        width = int(np.clip(width, 1, max(n // 10, 1)))
+        env = y_sq[: n - n % width].reshape(-1, width).mean(axis=-1)
+        with np.errstate(divide='ignore'):
+            return (np.arange(env.shape[0]) + 0.5) * width, 10 * np.log10(env / peak), width
+
+    def noise_level(start):
+        with np.errstate(divide='ignore'):
+            return 10 * np.log10(np.mean(y_sq[int(min(max(start, 0), 0.9 * n)) :]) / peak)
+
+    def decay_line(t, env_db, upper, lower):
+        i = np.argmax(env_db)
+        start = i + np.argmax(env_db[i:] <= upper) if upper < env_db[i] else i
+        below = np.flatnonzero(env_db[start:] <= lower)
+        if len(below) < 1 or below[0] < 2:
+            return None
+        slope, intercept = np.polyfit(t[start : start + below[0]], env_db[start : start + below[0]], 1)
+        return (slope, intercept) if slope < 0 else None
+
+    if n < 10 or peak <= 0:
+        return n, -np.inf, 0.0
+    t, env_db, width = envelope(interval / 1000 * sr)
+    noise_db = noise_level(0.9 * n)
+    line = decay_line(t, env_db, 0, noise_db + 10)
+    if line is None:
+        return n, noise_db, 0.0  # No noise floor within the response
+    crosspoint = (noise_db - line[1]) / line[0]
+
+    for _ in range(max_iterations):
+        t, env_db, width = envelope(-2 / line[0])  # About 5 intervals per 10dB of decay
+        noise_db = noise_level(crosspoint - 10 / line[0])
+        new_line = decay_line(t, env_db, noise_db + 25, noise_db + 5)
+        if new_line is None:
+            break
+        line = new_line
+        previous, crosspoint = crosspoint, (noise_db - line[1]) / line[0]
+        if abs(crosspoint - previous) < width:
+            break
+
+    crosspoint = int(np.clip(np.round(crosspoint), 1, n))
+    tail = peak * 10 ** (noise_db / 10) / (1 - 10 ** (line[0] / 10))  # Geometric decay past the crosspoint
+    return crosspoint, noise_db, tail
+
+
+def _truncate_energy(y_sq, lengths, sr: int, fs: int):
+    """
+    Zero the energy of each band and channel past its Lundeby crosspoint.
+
+    The compensation past a crosspoint is the geometric decay E_c * r**k of the late decay
+    line, where E_c is the noise floor energy it crosses and r the decay of one sample; its
+    first moment, crosspoint * tail + E_c * r / (1 - r)**2, keeps the center time unbiased.
+
+    Returns:
+        y_sq (np.array): Truncated energy; [bands, channels, samples]
+        tail (np.array): Compensation energy past each crosspoint; [bands, channels]
+        tail_moment (np.array): Energy-weighted sample index of the compensation; [bands, channels]
+    """
+    tail = np.zeros(y_sq.shape[:-1])
+    tail_moment = np.zeros(y_sq.shape[:-1])
+    with stage('truncation', fs=fs):
+        for c, length in enumerate(lengths):
+            length = _scaled_length(length, sr, fs)
+            for b in range(y_sq.shape[0]):
+                energy = y_sq[b, c, :length]
+                crosspoint, noise_db, tail[b, c] = lundeby_truncation(energy, fs)
+                if tail[b, c] > 0:
+                    e_c = np.max(energy) * 10 ** (noise_db / 10)  # Energy at the crosspoint
+                    r = 1 - e_c / tail[b, c]  # Since tail = e_c / (1 - r)
+                    tail_moment[b, c] = crosspoint * tail[b, c] + e_c * r / (1 - r) ** 2
+                y_sq[b, c, crosspoint:] = 0
+    return y_sq, tail, tail_moment
+
+
+def _decay_range(estimator: str):
     """
-    sr, ir_signal = wavfile.read(path)
-    rt60 = []
+    Get reference decay points and RT60 multiplier for a decay estimator.
 
-    # Get reference decay points based on selected estimator
+    Returns:
+        drop (tuple): Start and end levels of the regression range [dB]
+        multiplier (int): Factor for extrapolating the range to a 60dB decay
+    """
     estimator = str.lower(str(estimator))
     match estimator:
         case 'edt':
@@ -105,27 +311,797 @@ def rt60_from_ir(path: str, bands: list, estimator: str = 't30'):
             multiplier = 1
         case _:
             raise TypeError('Invalid estimator. Only valid options are "edt", "t10", "t20", "t30" and "t60".')
+    return drop, multiplier
 
-    for b in bands:
-        y = butter_bandpass_filter(ir_signal, b[0], b[1], sr, order=8)  # Bandpassed signal
-        y_abs = np.abs(y) / np.max(np.abs(y))  # Absolute values, normalized
 
-        # Scroeder integration
-        sch = np.cumsum(y_abs[::-1] ** 2)[::-1]  # Backwards integration
-        sch_db = sch_db = 10.0 * np.log10(sch / np.max(sch))  # Converted to dB
+def _parse_metric(metric: str):
+    """
+    Split a metric name into its kind and argument.
+
+    'c50'/'c80' -> ('clarity', 50/80), 'd50' -> ('definition', 50), 'ts' -> ('center_time', None),
+    'edt'/'t10'/'t20'/'t30'/'t60' -> ('decay', estimator)
+    """
+    metric = str.lower(str(metric))
+    if metric == 'ts':
+        return 'center_time', None
+    if metric[0] in ('c', 'd') and metric[1:].isdigit():
+        kind = 'clarity' if metric[0] == 'c' else 'definition'
+        return kind, int(metric[1:])
+    _decay_range(metric)  # Raises for unknown estimators
+    return 'decay', metric
+
+
+class EnergyIndex:
+    """
+    Cumulative energy of bandpassed, onset-trimmed impulse-responses.
+
+    Built once from the filtered bands, it answers early/late energy ratios at any time
+    limit in constant time, for a single limit or an array of them, and gives the
+    center time from the same data.
+
+    Parameters:
+        y_sq (np.array): Squared, bandpassed signals, starting at the onset; [..., samples]
+            the array is reused to store the cumulative energy
+        sr (int): Sample rate [Hz]
+        tail (float or np.array): Energy past the end of the signals (ex: the compensation
+            of a truncated noise floor), counted in the late and total energy; [...]
+        tail_moment (float or np.array): Energy-weighted sample index of the tail, counted
+            in the center time; [...]
+    """
 
-        # Reference decay x values points for slicing
-        a = np.where(sch_db <= drop[0])[0][0]
-        b = np.where(sch_db <= drop[1])[0][0]
+    def __init__(self, y_sq, sr: int, tail=0.0, tail_moment=0.0):
+        self.sr = sr
+        self.moment = y_sq @ np.arange(y_sq.shape[-1], dtype=np.float64) + tail_moment  # Energy-weighted sample index
+        self.cumulative = np.cumsum(y_sq, axis=-1, out=y_sq)
+        self.total = self.cumulative[..., -1] + tail
 
-        # Linear regression for segment of interest
-        sch_db_slice = sch_db[a:b]
-        t = np.linspace(0, (len(sch_db_slice) / sr), len(sch_db_slice))
-        slope, intercept = linregress(t, sch_db_slice)[:2]
+    def early(self, t_early):
+        """
+        Energy before one or more time limits.
+
+        Parameters:
+            t_early (float or array): Early time limit(s) [ms]
+
+        Returns:
+            energy (np.array): Early energy; [...] for a single limit, [..., limits] for an array
+        """
+        index = np.clip((np.asarray(t_early) / 1000 * self.sr).astype(int), 0, self.cumulative.shape[-1])
+        energy = np.take(self.cumulative, np.maximum(index - 1, 0), axis=-1)
+        return np.where(index > 0, energy, 0.0)
+
+    def _total(self, t_early):
+        return self.total if np.ndim(t_early) == 0 else self.total[..., None]
+
+    def clarity(self, t_early=50):
+        """Early-to-late energy ratio for one or more early time limits [ms]; [dB]"""
+        early = self.early(t_early)
+        return 10 * np.log10(early / (self._total(t_early) - early))
+
+    def definition(self, t_early=50):
+        """Early-to-total energy ratio for one or more early time limits [ms]; [dB]"""
+        return 10 * np.log10(self.early(t_early) / self._total(t_early))
+
+    def center_time(self):
+        """Center time; time of the energy centroid from the onset [ms]"""
+        return self.moment / self.total / self.sr * 1000
+
+
+def _schroeder_db(y):
+    """Normalized Schroeder backwards-integrated decay curves of bandpassed signals along the last axis [dB]."""
+    y_abs = np.abs(y) / np.max(np.abs(y), axis=-1, keepdims=True)  # Absolute values, normalized
+
+    # Scroeder integration
+    sch = np.cumsum(y_abs[..., ::-1] ** 2, axis=-1)[..., ::-1]  # Backwards integration
+    sch_db = 10.0 * np.log10(sch / np.max(sch, axis=-1, keepdims=True))  # Converted to dB
+    return sch_db
+
+
+def _truncated_schroeder_db(y, sr: int):
+    """
+    Normalized Schroeder decay curve of a bandpassed signal, integrated from its Lundeby
+    crosspoint with the estimated late decay energy added, so the noise floor is left out [dB].
+    """
+    y_sq = y**2
+    with stage('truncation'):
+        crosspoint, _, tail = lundeby_truncation(y_sq, sr)
+    sch = np.cumsum(y_sq[:crosspoint][::-1])[::-1] + tail  # Backwards integration
+    return 10.0 * np.log10(sch / sch[0])
+
+
+def _schroeder_db_in_place(y, out, sr: int = None):
+    """
+    Normalized Schroeder decay curve of a bandpassed signal, computed in a preallocated buffer [dB].
+
+    Squaring, backwards integration and dB conversion all write into the buffer, so no
+    full-length temporary arrays are allocated, and a float32 buffer halves its size.
+    With a sample rate, the curve is truncated at the Lundeby crosspoint as in _truncated_schroeder_db.
+
+    Parameters:
+        y (np.array): Bandpassed signal; [samples]
+        out (np.array): Buffer of at least as many samples, setting the precision (ex: float32)
+        sr (int): Sample rate [Hz]; None integrates the whole signal
+
+    Returns:
+        sch_db (np.array): Decay curve, as a view of the buffer; [samples]
+    """
+    sch = out[: y.shape[-1]]
+    np.square(y, out=sch, casting='same_kind')
+    tail = 0.0
+    if sr is not None:
+        with stage('truncation'):
+            crosspoint, _, tail = lundeby_truncation(sch, sr)
+        sch = sch[:crosspoint]
+    np.cumsum(sch[::-1], out=sch[::-1])  # Backwards integration
+    sch += tail
+    with np.errstate(divide='ignore'):
+        np.log10(sch, out=sch)  # Energy below float32 range gives -inf
+    sch -= sch[0]
+    sch *= 10.0
+    return sch
+
+
+def _rt_from_schroeder(sch_db, sr: int, ranges: list, monotonic: bool = True):
+    """
+    RT60 of Schroeder decay curves for several decay ranges at once [s].
+
+    The start and end of every range are found with a binary search on the monotonic
+    curves, and each regression is read in closed form from prefix sums of the curve up to
+    the deepest range end, so adding estimators costs almost nothing beyond the first.
+
+    Parameters:
+        sch_db (np.array): Normalized Schroeder decay curves; [..., samples]
+        sr (int): Sample rate [Hz]
+        ranges (list): List of tuples (drop, multiplier), as given by _decay_range
+        monotonic (bool): Whether the curves never rise; fluctuating curves (ex: the
+            smoothed energy of interrupted noise) are searched on their running minimum
+
+    Returns:
+        rt60 (np.array): RT60 values; [ranges, ...]
+    """
+    curves = sch_db.reshape(-1, sch_db.shape[-1])
+    drops = np.array([drop for drop, _ in ranges], dtype=np.float64)  # [ranges, 2]
+    multipliers = np.array([multiplier for _, multiplier in ranges])
+    search = curves if monotonic else np.minimum.accumulate(curves, axis=-1)
+    crossings = np.array([np.searchsorted(-c, -drops) for c in search])  # First index at or below each level
+    if (crossings >= curves.shape[-1]).any():
+        raise ValueError('The decay curve does not reach the end of the estimator range.')
+
+    end = crossings.max()
+    with np.errstate(invalid='ignore'):
+        sum_y = np.zeros((curves.shape[0], end + 1))
+        sum_iy = np.zeros((curves.shape[0], end + 1))
+        np.cumsum(curves[:, :end], axis=-1, out=sum_y[:, 1:])  # Prefix sums of the values
+        np.cumsum(curves[:, :end] * np.arange(end), axis=-1, out=sum_iy[:, 1:])  # And of the indexed values
+
+    a, b = crossings[..., 0], crossings[..., 1]  # [curves, ranges]
+    rows = np.arange(curves.shape[0])[:, None]
+    n = b - a
+    range_y = sum_y[rows, b] - sum_y[rows, a]
+    range_iy = sum_iy[rows, b] - sum_iy[rows, a] - a * range_y  # Indexes relative to range start
+    slope = _index_slope(n, range_y, range_iy)
+    rt60 = _rt_from_index_slope(slope, n, sr, drops.T[:, None, :], multipliers)  # Drops broadcast over curves
+    return rt60.T.reshape((len(ranges),) + sch_db.shape[:-1])
+
+
+def _index_slope(n, sum_y, sum_xy):
+    """
+    Least-squares slope of n values against their indexes (0 to n-1), from running sums
+    of the values and of the values multiplied by their indexes.
+    """
+    sum_x = n * (n - 1) / 2
+    sxx = n * (n**2 - 1) / 12  # Sum of squared deviations of the indexes
+    return (sum_xy - sum_x * sum_y / n) / sxx
+
+
+def _rt_from_index_slope(slope, n, sr: int, drop: tuple, multiplier: int):
+    """
+    RT60 from the slope of a Schroeder decay range given per sample index [s].
+
+    The regression time axis spans the range as linspace(0, n / sr, n).
+    """
+    dt = n / (sr * (n - 1))  # Time step of the regression axis [s]
+    return multiplier * (drop[1] - drop[0]) / (slope / dt)
+
+
+def _stream_energy(y, bands: list, sr: int, limits: list, block_size: int, workers=None, onset_db: float = None):
+    """
+    Early and late energy of each band and channel for several early time limits,
+    filtering the impulse-response block by block from the onset of each channel
+    (found with onset_db, as in _onset_index).
+
+    Returns:
+        early (np.array): Energy before each limit; [limits, bands, channels]
+        late (np.array): Energy from each limit on; [limits, bands, channels]
+        total (np.array): Energy from the onset on; [bands, channels]
+        moment (np.array): Energy-weighted sample index from the onset; [bands, channels]
+    """
+    onsets = _onset_index(y, block_size, onset_db)
+    shape = (len(limits), len(bands), y.shape[0])
+    early, late = np.zeros(shape), np.zeros(shape)
+    total, moment = np.zeros(shape[1:]), np.zeros(shape[1:])
 
-        # Calculate time multiplying linear regression
-        regress_start = (drop[0] - intercept) / slope
-        regress_end = (drop[1] - intercept) / slope
-        rt60.append(multiplier * (regress_end - regress_start))
+    offset = onsets.min()
+    blocks = _blocks(y, block_size, offset, onsets)
+    for yb in butter_filterbank_blocks(blocks, bands, sr, order=ENERGY_FILTER_ORDER, workers=workers):
+        y_sq = yb**2
+        index = offset + np.arange(y_sq.shape[-1]) - onsets[:, None]  # Samples from each channel's onset
+        for k, t in enumerate(limits):
+            early[k] += np.sum(y_sq, axis=-1, where=(index >= 0) & (index < t))
+            late[k] += np.sum(y_sq, axis=-1, where=index >= t)
+        total += np.sum(y_sq, axis=-1, where=index >= 0)
+        moment += np.sum(y_sq * index, axis=-1, where=index >= 0)
+        offset += y_sq.shape[-1]
+    return early, late, total, moment
 
+
+def _stream_rt(y, bands: list, sr: int, ranges: list, block_size: int, workers=None, onset_db: float = None):
+    """
+    RT60 of each band and channel for several decay ranges, filtering the impulse-response
+    block by block (from the onset of each channel, if onset_db is given).
+
+    A first pass gets the total energy of each band. A second pass builds the Schroeder
+    curve of each block from the energy left after it, and accumulates the regression sums
+    of the samples inside each decay range, so memory only depends on the block size.
+
+    Parameters:
+        ranges (list): List of tuples (drop, multiplier), as given by _decay_range
+
+    Returns:
+        rt60 (np.array): RT60 values; [ranges, bands, channels]
+    """
+    onsets = None if onset_db is None else _onset_index(y, block_size, onset_db)
+    start = 0 if onsets is None else onsets.min()
+
+    def filtered_blocks():
+        blocks = _blocks(y, block_size, start, onsets)
+        return butter_filterbank_blocks(blocks, bands, sr, order=DECAY_FILTER_ORDER, workers=workers)
+
+    total = np.zeros((len(bands), y.shape[0]))
+    for yb in filtered_blocks():
+        total += np.sum(yb**2, axis=-1)
+
+    shape = (len(ranges),) + total.shape
+    first = np.full(shape, -1)  # Index of the first sample in each range
+    reached = np.zeros(shape, dtype=bool)  # End of the range found
+    n, sum_y, sum_iy = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+
+    offset = start
+    used = np.zeros(total.shape)  # Energy of the previous blocks
+    for yb in filtered_blocks():
+        y_sq = yb**2
+        sch = total[..., None] - (used[..., None] + np.cumsum(y_sq, axis=-1) - y_sq)  # Backwards integration
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sch_db = 10.0 * np.log10(sch / total[..., None])
+        index = offset + np.arange(y_sq.shape[-1])
+
+        for k, (drop, _) in enumerate(ranges):
+            inside = (sch_db <= drop[0]) & (sch_db > drop[1])
+            starts = (first[k] < 0) & inside.any(axis=-1)
+            first[k][starts] = offset + np.argmax(inside[starts], axis=-1)
+            reached[k] |= (sch_db <= drop[1]).any(axis=-1)
+            n[k] += inside.sum(axis=-1)
+            sum_y[k] += np.sum(sch_db, axis=-1, where=inside)
+            sum_iy[k] += np.sum(index * sch_db, axis=-1, where=inside)
+
+        used += np.sum(y_sq, axis=-1)
+        offset += y_sq.shape[-1]
+
+    if not reached.all():
+        raise ValueError('The decay curve does not reach the end of the estimator range.')
+
+    rt60 = np.empty(shape)
+    for k, (drop, multiplier) in enumerate(ranges):
+        slope = _index_slope(n[k], sum_y[k], sum_iy[k] - first[k] * sum_y[k])  # Indexes relative to range start
+        rt60[k] = _rt_from_index_slope(slope, n[k], sr, drop, multiplier)
     return rt60
+
+
+def _energy_params(
+    y,
+    bands: list,
+    sr: int,
+    energy: dict,
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    onset_db: float = None,
+    truncate: bool = False,
+):
+    """
+    Clarity, definition and center time of each band and channel of an impulse-response.
+
+    Parameters:
+        y (np.array): Impulse-response; [channels, samples]
+        energy (dict): Metrics to be calculated, as name: (kind, t_early)
+        onset_db (float): Onset level relative to the peak (see _onset_index)
+        truncate (bool): Cut each band at its Lundeby crosspoint, compensating the late energy
+
+    Returns:
+        results (dict): Values for each band and channel, keyed by metric name; [bands, channels]
+    """
+    results = {}
+    if block_size:
+        limits = [int((p[1] / 1000) * sr) if p[1] is not None else 0 for p in energy.values()]
+        with stage('stream_energy', samples=y.shape[-1]):
+            early, late, total, moment = _stream_energy(y, bands, sr, limits, block_size, workers, onset_db)
+        for k, (m, (kind, _)) in enumerate(energy.items()):
+            match kind:
+                case 'clarity':
+                    values = 10 * np.log10(early[k] / late[k])
+                case 'definition':
+                    values = 10 * np.log10(early[k] / total)
+                case 'center_time':
+                    values = moment / total / sr * 1000
+            results[m] = np.round(values, decimals=6)
+        return results
+
+    y, lengths = _trim_onset(y, onset_db)  # Remove leading samples
+    if multirate:
+        filtered = [
+            (_mask_tail(yb[None] ** 2, lengths, sr, fs), fs)
+            for yb, fs in multirate_filterbank(y, bands, sr, order=ENERGY_FILTER_ORDER, workers=workers)
+        ]
+    else:
+        y_sq = butter_filterbank(y, bands, sr, order=ENERGY_FILTER_ORDER, workers=workers) ** 2  # Bandpassed energy
+        filtered = [(_mask_tail(y_sq, lengths, sr, sr), sr)]
+    if truncate:
+        filtered = [(*_truncate_energy(y_sq, lengths, sr, fs), fs) for y_sq, fs in filtered]
+    else:
+        filtered = [(y_sq, 0.0, 0.0, fs) for y_sq, fs in filtered]
+    with stage('energy_index', samples=y.shape[-1]):
+        indexes = [EnergyIndex(y_sq, fs, tail, tail_moment) for y_sq, tail, tail_moment, fs in filtered]
+    for m, (kind, t_early) in energy.items():
+        if kind == 'center_time':
+            values = np.vstack([index.center_time() for index in indexes])
+        else:
+            values = np.vstack([getattr(index, kind)(t_early) for index in indexes])
+        results[m] = np.round(values, decimals=6)
+    return results
+
+
+def _decay_params(
+    y,
+    bands: list,
+    sr: int,
+    decay: dict,
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    onset_db: float = None,
+    truncate: bool = False,
+    dtype='float64',
+):
+    """
+    RT60 of each band and channel of an impulse-response, for one or more estimators.
+
+    Parameters:
+        y (np.array): Impulse-response; [channels, samples]
+        decay (dict): Metrics to be calculated, as name: (drop, multiplier)
+        onset_db (float): Onset level relative to the peak (see _onset_index);
+            None integrates the whole signal
+        truncate (bool): Integrate each band from its Lundeby crosspoint, leaving out the noise floor
+        dtype (dtype): Precision of the Schroeder curves; other than float64, each band is filtered
+            on its own and integrated in place in a buffer reused across bands (see _schroeder_db_in_place)
+
+    Returns:
+        results (dict): Values for each band and channel, keyed by metric name; [bands, channels]
+    """
+    if block_size:
+        with stage('stream_rt', samples=y.shape[-1]):
+            rt60 = _stream_rt(y, bands, sr, list(decay.values()), block_size, workers, onset_db)
+        return dict(zip(decay, rt60))
+
+    dtype = np.dtype(dtype)
+    low_memory = dtype != np.float64
+    lengths = np.full(y.shape[0], y.shape[-1])
+    if onset_db is not None:
+        y, lengths = _trim_onset(y, onset_db)
+    if multirate:
+        filtered = multirate_filterbank(y, bands, sr, order=DECAY_FILTER_ORDER, workers=workers)
+    elif low_memory:
+        filtered = None  # Each band is filtered when it is analysed
+    else:
+        filtered = [(yb, sr) for yb in butter_filterbank(y, bands, sr, order=DECAY_FILTER_ORDER, workers=workers)]
+    buffers = threading.local()  # Schroeder buffer of each thread, reused across bands
+    ranges = list(decay.values())
+
+    def channel_db(ch, fs):
+        buffer = getattr(buffers, 'sch', None)
+        if buffer is None or buffer.shape[0] < ch.shape[-1]:
+            buffer = buffers.sch = np.empty(ch.shape[-1], dtype=dtype)
+        return _schroeder_db_in_place(ch, buffer, fs if truncate else None)
+
+    def band_rt(i):
+        if filtered is None:
+            yb, fs = butter_bandpass_filter(y, bands[i][0], bands[i][1], sr, order=DECAY_FILTER_ORDER), sr
+        else:
+            yb, fs = filtered[i]
+        band = tuple(bands[i])
+        if not (low_memory or truncate) and (lengths == lengths[0]).all():  # No padding, all channels at once
+            with stage('schroeder', band=band):
+                sch_db = _schroeder_db(yb)
+            with stage('regression', band=band):
+                return _rt_from_schroeder(sch_db, fs, ranges)
+
+        rt60 = []
+        for ch in (ch[: _scaled_length(n, sr, fs)] for ch, n in zip(yb, lengths)):
+            with stage('schroeder', band=band):
+                if low_memory:
+                    ch_db = channel_db(ch, fs)
+                elif truncate:
+                    ch_db = _truncated_schroeder_db(ch, fs)
+                else:
+                    ch_db = _schroeder_db(ch)
+            with stage('regression', band=band):
+                rt60.append(_rt_from_schroeder(ch_db, fs, ranges))
+        return np.stack(rt60, axis=-1)  # [metrics, channels]
+
+    rt60 = np.array(thread_map(band_rt, range(len(bands)), workers))  # [bands, metrics, channels]
+    return {m: rt60[:, k] for k, m in enumerate(decay)}
+
+
+def _cached_analyze(
+    path,
+    bands: list,
+    parsed: dict,
+    multirate: bool,
+    block_size: int,
+    workers,
+    cache,
+    onset_db: float,
+    truncate: bool,
+    dtype,
+):
+    """
+    Look up every parsed metric in a persistent result cache, loading and analysing the
+    impulse-response only for the metrics that are not stored yet.
+    """
+    path, digest = content_digest(path)
+    settings = {'multirate': multirate, 'onset_db': onset_db, 'truncate': truncate}
+    energy_settings = {'order': ENERGY_FILTER_ORDER}
+    decay_settings = {'order': DECAY_FILTER_ORDER, 'dtype': str(np.dtype(dtype))}
+    keys = {
+        m: cache.key(digest, bands, p, **settings, **(decay_settings if p[0] == 'decay' else energy_settings))
+        for m, p in parsed.items()
+    }
+    results = {m: cache.get(k) for m, k in keys.items()}
+
+    missing = {m: p for m, p in parsed.items() if results[m] is None}
+    if missing:
+        computed = _analyze(path, bands, missing, multirate, block_size, workers, None, onset_db, truncate, dtype)
+        for m, values in computed.items():
+            cache.put(keys[m], values)
+        results.update(computed)
+    return results
+
+
+def _analyze(
+    path,
+    bands: list,
+    parsed: dict,
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    cache=None,
+    onset_db: float = None,
+    truncate: bool = False,
+    dtype='float64',
+):
+    """
+    Load an impulse-response once and calculate every parsed metric from it.
+
+    Multichannel impulse-responses (samples, channels) are filtered with all channels
+    in each call, giving a list of values per channel for each band. With workers,
+    bands are processed concurrently in a thread pool shared by every stage. With a
+    cache, stored results are returned without loading or filtering the audio.
+
+    The onset (onset_db) and noise-floor truncation (truncate) stages apply to every metric.
+
+    Parameters:
+        parsed (dict): Metrics to be calculated, as name: (kind, argument), as given by _parse_metric
+
+    Returns:
+        results (dict): List of values for each band, keyed by metric name
+    """
+    with tagged(source=_source_name(path)):  # Every stage of the analysis, by file
+        if multirate and block_size:
+            raise ValueError('Multirate filtering is not available in streaming mode.')
+        if truncate and block_size:
+            raise ValueError('Noise-floor truncation is not available in streaming mode.')
+        if cache is not None:
+            return _cached_analyze(
+                path, bands, parsed, multirate, block_size, workers, cache, onset_db, truncate, dtype
+            )
+
+        energy = {m: p for m, p in parsed.items() if p[0] != 'decay'}
+        decay = {m: _decay_range(p[1]) for m, p in parsed.items() if p[0] == 'decay'}
+
+        with stage('read'):
+            sr, ir_signal = _read_ir(path, mmap=bool(block_size))
+        mono = ir_signal.ndim == 1
+        if block_size:
+            y = np.atleast_2d(ir_signal.T)  # Channels view of the memory-mapped file
+        else:
+            y = np.ascontiguousarray(np.atleast_2d(ir_signal.T))  # One row per channel
+
+        executor = ThreadPoolExecutor(max_workers=workers) if isinstance(workers, int) and workers > 1 else workers
+        try:
+            results = {}
+            if energy:
+                results.update(
+                    _energy_params(y, bands, sr, energy, multirate, block_size, executor, onset_db, truncate)
+                )
+            if decay:
+                results.update(
+                    _decay_params(y, bands, sr, decay, multirate, block_size, executor, onset_db, truncate, dtype)
+                )
+        finally:
+            if executor is not workers:
+                executor.shutdown()
+        return {m: (results[m][:, 0] if mono else results[m]).tolist() for m in parsed}
+
+
+def clarity_from_ir(
+    path,
+    bands: list,
+    t_early: int = 50,
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    cache=None,
+    onset_db: float = None,
+    truncate: bool = False,
+):
+    """
+    Calculate clarity parameter from an impulse-response in .wav format.
+
+    Parameters:
+        path (string): Path to file. Must be a .wav audio file containing
+            an impulse-response. Can be any bit sample-rate and bit depth.
+            Can also be the .wav file contents (bytes), an open binary .wav file,
+            or a tuple (samples, sample rate) with an array already in memory
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        t_early (int): Early time limit for early/late energy; [ms]
+            (50ms for C50 and 80ms for C80 standards)
+        multirate (bool): Filter each band at a reduced sample rate; results are within
+            a stated tolerance of the full-rate ones (see filter.multirate_filterbank)
+        block_size (int): Streaming mode; memory-map the file and filter it in blocks
+            of this many samples, so memory does not grow with file length
+        workers (int or Executor): Number of threads processing bands concurrently, or
+            an executor to run them on; results keep the band order
+        cache (ResultCache): Persistent result cache (see cache.ResultCache); results
+            found in it are returned without loading or filtering the audio
+        onset_db (float): Onset level relative to the peak [dB] (ex: -20, as in ISO 3382-1);
+            samples before the onset are trimmed, so the early window starts there;
+            None starts at the first positive sample
+        truncate (bool): End the late energy of each band at its Lundeby crosspoint with the
+            noise floor, adding the energy of the extrapolated decay past it instead
+            (not available in streaming mode)
+
+    Returns:
+        clarity (list): List containing clarity values for each band
+            (a list of values per channel for multichannel impulse-responses)
+    """
+    parsed = {'c': ('clarity', t_early)}
+    return _analyze(path, bands, parsed, multirate, block_size, workers, cache, onset_db, truncate)['c']
+
+
+def definition_from_ir(
+    path,
+    bands: list,
+    t_early: int = 50,
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    cache=None,
+    onset_db: float = None,
+    truncate: bool = False,
+):
+    """
+    Calculate definition parameter from an impulse-response in .wav format.
+
+    Parameters:
+        path (string): Path to file. Must be a .wav audio file containing
+            an impulse-response. Can be any bit sample-rate and bit depth.
+            Can also be the .wav file contents (bytes), an open binary .wav file,
+            or a tuple (samples, sample rate) with an array already in memory
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        t_early (int): Early time limit for early/total energy; [ms]
+            (50ms for D50 and 80ms for D80 standards)
+        multirate (bool): Filter each band at a reduced sample rate; results are within
+            a stated tolerance of the full-rate ones (see filter.multirate_filterbank)
+        block_size (int): Streaming mode; memory-map the file and filter it in blocks
+            of this many samples, so memory does not grow with file length
+        workers (int or Executor): Number of threads processing bands concurrently, or
+            an executor to run them on; results keep the band order
+        cache (ResultCache): Persistent result cache (see cache.ResultCache); results
+            found in it are returned without loading or filtering the audio
+        onset_db (float): Onset level relative to the peak [dB] (ex: -20, as in ISO 3382-1);
+            the early and total energy are summed from it; None takes the first positive sample
+        truncate (bool): Sum the total energy of each band only up to where its decay meets
+            the noise floor (Lundeby's method), plus the extrapolated decay beyond
+            (not available in streaming mode)
+
+    Returns:
+        definition (list): List containing definition values for each band
+            (a list of values per channel for multichannel impulse-responses)
+    """
+    parsed = {'d': ('definition', t_early)}
+    return _analyze(path, bands, parsed, multirate, block_size, workers, cache, onset_db, truncate)['d']
+
+
+def center_time_from_ir(
+    path,
+    bands: list,
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    cache=None,
+    onset_db: float = None,
+    truncate: bool = False,
+):
+    """
+    Calculate center time (Ts) from an impulse-response in .wav format.
+
+    Parameters:
+        path (string): Path to file. Must be a .wav audio file containing
+            an impulse-response. Can be any bit sample-rate and bit depth.
+            Can also be the .wav file contents (bytes), an open binary .wav file,
+            or a tuple (samples, sample rate) with an array already in memory
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        multirate (bool): Filter each band at a reduced sample rate; results are within
+            a stated tolerance of the full-rate ones (see filter.multirate_filterbank)
+        block_size (int): Streaming mode; memory-map the file and filter it in blocks
+            of this many samples, so memory does not grow with file length
+        workers (int or Executor): Number of threads processing bands concurrently, or
+            an executor to run them on; results keep the band order
+        cache (ResultCache): Persistent result cache (see cache.ResultCache); results
+            found in it are returned without loading or filtering the audio
+        onset_db (float): Onset level relative to the peak [dB] (ex: -20, as in ISO 3382-1);
+            center time is measured from it; None takes the first positive sample
+        truncate (bool): Weight the centroid of each band only up to where its decay meets the
+            noise floor (Lundeby's method), counting the extrapolated decay past it instead, as
+            the noise would pull the centroid later (not available in streaming mode)
+
+    Returns:
+        center_time (list): List containing center time values for each band [ms]
+            (a list of values per channel for multichannel impulse-responses)
+    """
+    parsed = {'ts': ('center_time', None)}
+    return _analyze(path, bands, parsed, multirate, block_size, workers, cache, onset_db, truncate)['ts']
+
+
+def energy_index_from_ir(
+    path, bands: list, workers=None, onset_db: float = None, truncate: bool = False
+) -> EnergyIndex:
+    """
+    Build a cumulative energy index from an impulse-response, for querying clarity,
+    definition and center time at any early time limit (ex: clarity-vs-time curves).
+
+    Parameters:
+        path (string): Path to file, .wav contents, open .wav file or tuple (samples, sample rate)
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        workers (int or Executor): Number of threads filtering bands concurrently
+        onset_db (float): Onset level relative to the peak [dB]; None takes the first positive sample
+        truncate (bool): Cut each band at its Lundeby crosspoint, compensating the late energy
+
+    Returns:
+        index (EnergyIndex): Cumulative energy of each band; [bands, samples]
+            or [bands, channels, samples] for multichannel impulse-responses
+    """
+    with tagged(source=_source_name(path)):
+        with stage('read'):
+            sr, ir_signal = _read_ir(path)
+        y, lengths = _trim_onset(np.ascontiguousarray(np.atleast_2d(ir_signal.T)), onset_db)  # Remove leading samples
+        y_sq = butter_filterbank(y, bands, sr, order=ENERGY_FILTER_ORDER, workers=workers) ** 2  # Bandpassed energy
+        y_sq, tail, tail_moment = _mask_tail(y_sq, lengths, sr, sr), 0.0, 0.0
+        if truncate:
+            y_sq, tail, tail_moment = _truncate_energy(y_sq, lengths, sr, sr)
+        with stage('energy_index', samples=y.shape[-1]):
+            if ir_signal.ndim == 1:
+                if truncate:
+                    tail, tail_moment = tail[:, 0], tail_moment[:, 0]
+                return EnergyIndex(y_sq[:, 0], sr, tail, tail_moment)
+            return EnergyIndex(y_sq, sr, tail, tail_moment)
+
+
+def rt60_from_ir(
+    path,
+    bands: list,
+    estimator: str = 't30',
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    cache=None,
+    onset_db: float = None,
+    truncate: bool = False,
+    dtype='float64',
+):
+    """
+    Get RT60 from a .wav impulse-response file.
+
+    Parameters:
+        path (string): Path to file. Must be a .wav audio file containing
+            an impulse-response. Can be any bit sample-rate and bit depth.
+            Can also be the .wav file contents (bytes), an open binary .wav file,
+            or a tuple (samples, sample rate) with an array already in memory
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+            Usually, RT60 is calculated using octave or third-octave bands
+        estimator (string): Measurement range to be used to determine the RT60 using
+            only a limited dynamic-range. [edt, t20, t30, t60]
+        multirate (bool): Filter each band at a reduced sample rate; results are within
+            a stated tolerance of the full-rate ones (see filter.multirate_filterbank)
+        block_size (int): Streaming mode; memory-map the file and filter it in blocks
+            of this many samples, so memory does not grow with file length
+        workers (int or Executor): Number of threads processing bands concurrently, or
+            an executor to run them on; results keep the band order
+        cache (ResultCache): Persistent result cache (see cache.ResultCache); results
+            found in it are returned without loading or filtering the audio
+        onset_db (float): Onset level relative to the peak [dB] (ex: -20, as in ISO 3382-1);
+            the decay curve starts at it; None integrates from the beginning of the file
+        truncate (bool): Start the backwards integration of each band at its Lundeby crosspoint,
+            adding the energy of the extrapolated decay past it, so the noise floor does not
+            flatten the decay curve (not available in streaming mode)
+        dtype (dtype): Precision of the Schroeder decay curves; float32 filters and integrates
+            one band at a time in place, cutting peak memory (RT60 within 0.001s of float64)
+
+    Returns:
+        rt60 (list): List containing RT60 values for each frequency band [s]
+            (a list of values per channel for multichannel impulse-responses)
+    """
+    parsed = {'rt': ('decay', str.lower(str(estimator)))}
+    return _analyze(path, bands, parsed, multirate, block_size, workers, cache, onset_db, truncate, dtype)['rt']
+
+
+def analyze_ir(
+    path,
+    bands: list,
+    metrics: list = ('c50', 'c80', 'd50', 'edt', 't20', 't30'),
+    multirate: bool = False,
+    block_size: int = None,
+    workers=None,
+    cache=None,
+    onset_db: float = None,
+    truncate: bool = False,
+    dtype='float64',
+):
+    """
+    Calculate several acoustic parameters from a single impulse-response.
+
+    The file is read once and each band is filtered once for the energy parameters
+    (clarity, definition and center time, all read from one EnergyIndex) and once for
+    the decay parameters, sharing the filtered signals between every requested metric.
+    Results are the same as those given by clarity_from_ir, definition_from_ir and rt60_from_ir.
+
+    Parameters:
+        path (string): Path to file. Must be a .wav audio file containing
+            an impulse-response. Can be any bit sample-rate and bit depth.
+            Can also be the .wav file contents (bytes), an open binary .wav file,
+            or a tuple (samples, sample rate) with an array already in memory
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+        metrics (list): Parameters to be calculated; clarity as 'cXX' and definition
+            as 'dXX', where XX is the early time limit [ms] (ex: 'c50', 'c80', 'd50'),
+            center time as 'ts' [ms], and RT60 estimators as 'edt', 't10', 't20', 't30' or 't60'
+        multirate (bool): Filter each band at a reduced sample rate; results are within
+            a stated tolerance of the full-rate ones (see filter.multirate_filterbank)
+        block_size (int): Streaming mode; memory-map the file and filter it in blocks
+            of this many samples, so memory does not grow with file length
+        workers (int or Executor): Number of threads processing bands concurrently, or
+            an executor to run them on; results keep the band order
+        cache (ResultCache): Persistent result cache (see cache.ResultCache); results
+            found in it are returned without loading or filtering the audio
+        onset_db (float): Onset level relative to the peak [dB] (ex: -20, as in ISO 3382-1);
+            None starts at the first positive sample (energy parameters) or at the
+            beginning of the file (decay parameters)
+        truncate (bool): Estimate the noise floor of each band with Lundeby's method and
+            leave it out of the integration, compensating for the truncated decay
+            (not available in streaming mode)
+        dtype (dtype): Precision of the Schroeder decay curves; float32 filters and integrates
+            one band at a time in place, cutting peak memory (RT60 within 0.001s of float64)
+
+    Returns:
+        results (dict): Dictionary containing a list of values for each band, keyed by metric name
+            (a list of values per channel for multichannel impulse-responses)
+    """
+    parsed = {str.lower(str(m)): _parse_metric(m) for m in metrics}
+    return _analyze(path, bands, parsed, multirate, block_size, workers, cache, onset_db, truncate, dtype)
@@ -10,6 +10,7 @@ import numpy as np
 from acoustician_tools.utils import *
 
 SOUNDSPEED = sound_speed(20.0)
+RT_FORMULAS = ('sabine', 'eyring', 'millington', 'fitzroy', 'arau')
 
 
 def schroeder_frequency(t30: float, v: float):
@@ -43,29 +44,39 @@ def rt_constant(sound_speed: float = SOUNDSPEED, decay_db: int = 60) -> float:
     return constant
 
 
+def _room_arrays(volume, surfaces, alphas):
+    """Arrays of the room geometry and absorption, with the surfaces on the last axis."""
+    return tuple(np.asarray(x, dtype=np.float64) for x in (volume, surfaces, alphas))
+
+
+def _pairs(x):
+    """Sum over each pair of opposite boundaries, in the order of shoebox_surfaces; [..., 3] (x, y, z)"""
+    return x[..., 0:6:2] + x[..., 1:6:2]
+
+
 def rt_sabine(volume: float, surfaces: list, alphas: list, decay: int = 60, c: float = 343.0) -> float | list:
     """
     Calculate theoretical reverberation time using Sabine's equation for one or more frequency bands.
 
     Parameters:
-        volume (float): Total volume of the room [m3]
-        surfaces (list of floats): Surface area of each boundary [m2]
-        alphas (1d or 2d list of floats): Absortion coefficient for each boundary; [0-1]
-            first dimension corresponds to boundary and second dimension to alpha
+        volume (float or array): Total volume of the room [m3]; [rooms, 1] for a batch of rooms
+        surfaces (list of floats): Surface area of each boundary [m2]; [rooms, 1, surfaces] for a batch of rooms
+        alphas (1d, 2d or 3d list of floats): Absortion coefficient for each boundary; [0-1]
+            last dimension corresponds to boundary, and leading dimensions to frequency bands
+            (and rooms); ex: [rooms, bands, surfaces]
         decay (int): intensity drop for computing reverberation time [dB]
             ex: 60 for RT60, 30 for RT30...
         c (float): speed of sound [m/s]
 
     Returns:
         rt (float or list): Reverberation time. Amount of time required for a decay [s]
-            of specified amount of dB at one or more frequency bands.
+            of specified amount of dB at one or more frequency bands; [rooms, bands] for a batch of rooms
     """
-
-    total_surface = np.sum(surfaces)
-    mean_alpha = np.average(alphas, axis=-1, weights=surfaces)
+    volume, surfaces, alphas = _room_arrays(volume, surfaces, alphas)
+    absorption = np.sum(surfaces * alphas, axis=-1)  # Total surface times mean alpha
     constant = rt_constant(c, decay)
 
-    rt = constant * volume / (total_surface * mean_alpha)
+    rt = constant * volume / absorption
     return rt
 
 
@@ -74,21 +85,22 @@ def rt_eyring(volume: float, surfaces: list, alphas: list, decay: int = 60, c: f
     Calculate theoretical reverberation time using Eyring-Norris equation for one or more frequency bands.
 
     Parameters:
-        volume (float): Total volume of the room [m3]
-        surfaces (list of floats): Surface area of each boundary [m2]
-        alphas (1d or 2d list of floats): Absortion coefficient for each boundary; [0-1]
-            first dimension corresponds to boundary and second dimension to alpha
+        volume (float or array): Total volume of the room [m3]; [rooms, 1] for a batch of rooms
+        surfaces (list of floats): Surface area of each boundary [m2]; [rooms, 1, surfaces] for a batch of rooms
+        alphas (1d, 2d or 3d list of floats): Absortion coefficient for each boundary; [0-1]
+            last dimension corresponds to boundary, and leading dimensions to frequency bands
+            (and rooms); ex: [rooms, bands, surfaces]
         decay (int): intensity drop for computing reverberation time [dB]
             ex: 60 for RT60, 30 for RT30...
         c (float): speed of sound [m/s]
 
     Returns:
         rt (float or list): Reverberation time. Amount of time required for a decay [s]
-            of specified amount of dB at one or more frequency bands.
+            of specified amount of dB at one or more frequency bands; [rooms, bands] for a batch of rooms
     """
-
-    total_surface = np.sum(surfaces)
-    mean_alpha = np.average(alphas, axis=-1, weights=surfaces)
+    volume, surfaces, alphas = _room_arrays(volume, surfaces, alphas)
+    total_surface = np.sum(surfaces, axis=-1)
+    mean_alpha = np.sum(surfaces * alphas, axis=-1) / total_surface
     constant = rt_constant(c, decay)
 
     rt = constant * volume / (-total_surface * np.log(1 - mean_alpha))
@@ -100,18 +112,20 @@ def rt_millington(volume: float, surfaces: list, alphas: list, decay: int = 60,
     Calculate theoretical reverberation time using Millington-Sette equation for one or more frequency bands.
 
     Parameters:
-        volume (float): Total volume of the room [m3]
-        surfaces (list of floats): Surface area of each boundary [m2]
-        alphas (1d or 2d list of floats): Absortion coefficient for each boundary; [0-1]
-            first dimension corresponds to boundary and second dimension to alpha
+        volume (float or array): Total volume of the room [m3]; [rooms, 1] for a batch of rooms
+        surfaces (list of floats): Surface area of each boundary [m2]; [rooms, 1, surfaces] for a batch of rooms
+        alphas (1d, 2d or 3d list of floats): Absortion coefficient for each boundary; [0-1]
+            last dimension corresponds to boundary, and leading dimensions to frequency bands
+            (and rooms); ex: [rooms, bands, surfaces]
         decay (int): intensity drop for computing reverberation time [dB]
             ex: 60 for RT60, 30 for RT30...
         c (float): speed of sound [m/s]
 
     Returns:
         rt (float or list): Reverberation time. Amount of time required for a decay [s]
-            of specified amount of dB at one or more frequency bands.
+            of specified amount of dB at one or more frequency bands; [rooms, bands] for a batch of rooms
     """
+    volume, surfaces, alphas = _room_arrays(volume, surfaces, alphas)
     sigma = -np.sum(surfaces * np.log(1 - alphas), axis=-1)
     constant = rt_constant(c, decay)
     rt = constant * volume / sigma
@@ -123,29 +137,29 @@ def rt_fitzroy(volume: float, surfaces: list, alphas: list, decay: int = 60, c:
     Calculate theoretical reverberation time using Fitzroy equation for one or more frequency bands.
 
     Parameters:
-        volume (float): Total volume of the room [m3]
-        surfaces (list of floats): Surface area of each boundary [m2]
-        alphas (1d or 2d list of floats): Absortion coefficient for each boundary; [0-1]
-            first dimension corresponds to boundary and second dimension to alpha
+        volume (float or array): Total volume of the room [m3]; [rooms, 1] for a batch of rooms
+        surfaces (list of floats): Surface area of each boundary [m2], in the order of
+            shoebox_surfaces; [rooms, 1, surfaces] for a batch of rooms
+        alphas (1d, 2d or 3d list of floats): Absortion coefficient for each boundary; [0-1]
+            last dimension corresponds to boundary, and leading dimensions to frequency bands
+            (and rooms); ex: [rooms, bands, surfaces]
         decay (int): intensity drop for computing reverberation time [dB]
             ex: 60 for RT60, 30 for RT30...
         c (float): speed of sound [m/s]
 
     Returns:
         rt (float or list): Reverberation time. Amount of time required for a decay [s]
-            of specified amount of dB at one or more frequency bands.
+            of specified amount of dB at one or more frequency bands; [rooms, bands] for a batch of rooms
     """
-
+    volume, surfaces, alphas = _room_arrays(volume, surfaces, alphas)
     constant = rt_constant(c, decay)
 
-    x, y, z = np.sum(surfaces[0:2]), np.sum(surfaces[2:4]), np.sum(surfaces[4:6])
-    alpha_x = alphas.transpose()[0:2].sum(axis=0) / 2
-    alpha_y = alphas.transpose()[2:4].sum(axis=0) / 2
-    alpha_z = alphas.transpose()[4:6].sum(axis=0) / 2
+    x, y, z = np.moveaxis(_pairs(surfaces), -1, 0)
+    alpha_x, alpha_y, alpha_z = np.moveaxis(_pairs(alphas) / 2, -1, 0)
 
     rt = (
         constant
-        * (volume / np.sum(surfaces) ** 2)
+        * (volume / np.sum(surfaces, axis=-1) ** 2)
         * ((-x / np.log(1 - alpha_x)) + (-y / np.log(1 - alpha_y)) + (-z / np.log(1 - alpha_z)))
     )
     return rt
@@ -156,26 +170,26 @@ def rt_arau(volume: float, surfaces: list, alphas: list, decay: int = 60, c: flo
     Calculate theoretical reverberation time using Arau-Puchades equation for one or more frequency bands.
 
     Parameters:
-        volume (float): Total volume of the room [m3]
-        surfaces (list of floats): Surface area of each boundary [m2]
-        alphas (1d or 2d list of floats): Absortion coefficient for each boundary; [0-1]
-            first dimension corresponds to boundary and second dimension to alpha
+        volume (float or array): Total volume of the room [m3]; [rooms, 1] for a batch of rooms
+        surfaces (list of floats): Surface area of each boundary [m2], in the order of
+            shoebox_surfaces; [rooms, 1, surfaces] for a batch of rooms
+        alphas (1d, 2d or 3d list of floats): Absortion coefficient for each boundary; [0-1]
+            last dimension corresponds to boundary, and leading dimensions to frequency bands
+            (and rooms); ex: [rooms, bands, surfaces]
         decay (int): intensity drop for computing reverberation time [dB]
             ex: 60 for RT60, 30 for RT30...
         c (float): speed of sound [m/s]
 
     Returns:
         rt (float or list): Reverberation time. Amount of time required for a decay [s]
-            of specified amount of dB at one or more frequency bands.
+            of specified amount of dB at one or more frequency bands; [rooms, bands] for a batch of rooms
     """
+    volume, surfaces, alphas = _room_arrays(volume, surfaces, alphas)
     constant = rt_constant(c, decay)
 
-    s_tot = np.sum(surfaces)
-    sx, sy, sz = np.sum(surfaces[0:2]), np.sum(surfaces[2:4]), np.sum(surfaces[4:6])
-
-    ax = np.average(alphas.transpose()[0:2], axis=0, weights=surfaces[0:2])
-    ay = np.average(alphas.transpose()[2:4], axis=0, weights=surfaces[2:4])
-    az = np.average(alphas.transpose()[4:6], axis=0, weights=surfaces[4:6])
+    s_tot = np.sum(surfaces, axis=-1)
+    sx, sy, sz = np.moveaxis(_pairs(surfaces), -1, 0)
+    ax, ay, az = np.moveaxis(_pairs(surfaces * alphas) / _pairs(surfaces), -1, 0)  # Area-weighted
 
     x_term = ((constant * volume) / -(s_tot * np.log(1 - ax))) ** (sx / s_tot)
     y_term = ((constant * volume) / -(s_tot * np.log(1 - ay))) ** (sy / s_tot)
@@ -183,3 +197,184 @@ def rt_arau(volume: float, surfaces: list, alphas: list, decay: int = 60, c: flo
 
     rt = x_term * y_term * z_term
     return rt
+
+
+def rt_all(volume: float, surfaces: list, alphas: list, decay: int = 60, c: float = 343.0) -> dict:
+    """
+    Calculate theoretical reverberation times with every formula (Sabine, Eyring-Norris,
+    Millington-Sette, Fitzroy and Arau-Puchades) at once, computing the terms they share
+    (total surface, absorption area, per-axis surfaces and absorption) a single time.
+
+    Parameters:
+        volume (float or array): Total volume of the room [m3]; [rooms, 1] for a batch of rooms
+        surfaces (list of floats): Surface area of each boundary [m2], in the order of
+            shoebox_surfaces; [rooms, 1, surfaces] for a batch of rooms
+        alphas (1d, 2d or 3d list of floats): Absortion coefficient for each boundary; [0-1]
+            last dimension corresponds to boundary, and leading dimensions to frequency bands
+            (and rooms); ex: [rooms, bands, surfaces]
+        decay (int): intensity drop for computing reverberation time [dB]
+            ex: 60 for RT60, 30 for RT30...
+        c (float): speed of sound [m/s]
+
+    Returns:
+        rt (dict): Reverberation times keyed by formula (sabine, eyring, millington, fitzroy, arau),
+            each as returned by its rt_ function
+    """
+    volume, surfaces, alphas = _room_arrays(volume, surfaces, alphas)
+    cv = rt_constant(c, decay) * volume
+
+    s_tot = np.sum(surfaces, axis=-1)
+    weighted = surfaces * alphas
+    absorption = np.sum(weighted, axis=-1)
+    s_axes = _pairs(surfaces)  # [..., x y z]
+    ratio = s_axes / s_tot[..., None]
+
+    return {
+        'sabine': cv / absorption,
+        'eyring': cv / (-s_tot * np.log(1 - absorption / s_tot)),
+        'millington': cv / -np.sum(surfaces * np.log(1 - alphas), axis=-1),
+        'fitzroy': cv / s_tot**2 * np.sum(-s_axes / np.log(1 - _pairs(alphas) / 2), axis=-1),
+        'arau': np.prod(
+            (cv[..., None] / -(s_tot[..., None] * np.log(1 - _pairs(weighted) / s_axes))) ** ratio, axis=-1
+        ),
+    }
+
+
+class RoomModel:
+    """
+    Stateful room model for interactive design, keeping the absorption aggregates of the
+    reverberation formulas up to date as surfaces are added, changed or removed.
+
+    Each change updates the aggregates (total surface, sum of S·α, sum of S·ln(1-α), and the
+    per-axis surfaces and absorption used by Fitzroy and Arau-Puchades) in O(bands) time,
+    instead of recomputing them over every surface. Results match the rt_ functions; with
+    more than two surfaces on an axis, Fitzroy takes the mean α of all of them.
+
+    Parameters:
+        volume (float): Total volume of the room [m3]
+        bands (int): Number of frequency bands of the absorption coefficients
+        decay (int): intensity drop for computing reverberation time [dB]
+        c (float): speed of sound [m/s]
+
+    Usage:
+        model = RoomModel.shoebox(10, 7, 4, alphas)  # alphas: [bands, surfaces]
+        model.set_alphas('floor', [0.3, 0.4, 0.5])
+        model.rt()['eyring']
+    """
+
+    SHOEBOX_NAMES = ('side_left', 'side_right', 'front', 'rear', 'floor', 'ceiling')
+
+    def __init__(self, volume: float, bands: int = 1, decay: int = 60, c: float = 343.0):
+        self.volume = volume
+        self.bands = bands
+        self.decay = decay
+        self.c = c
+        self.surfaces = {}  # name: (area, alphas, axis)
+        self._next_name = 0
+        self.refresh()
+
+    @classmethod
+    def shoebox(cls, length: float, width: float, height: float, alphas: list, decay: int = 60, c: float = 343.0):
+        """
+        Model of a shoebox room, with the boundaries of shoebox_surfaces named as in SHOEBOX_NAMES.
+
+        Parameters:
+            alphas (1d or 2d list of floats): Absortion coefficient of each boundary, as in the
+                rt_ functions; [surfaces] or [bands, surfaces]
+        """
+        alphas = np.asarray(alphas, dtype=np.float64).reshape(-1, 6).T  # [surfaces, bands]
+        model = cls(length * width * height, alphas.shape[-1], decay, c)
+        for i, (name, area) in enumerate(zip(cls.SHOEBOX_NAMES, shoebox_surfaces(length, width, height))):
+            model.add_surface(area, alphas[i], axis=i // 2, name=name)
+        return model
+
+    def refresh(self):
+        """Recompute every aggregate from the stored surfaces (ex: to discard accumulated rounding)."""
+        self._area = 0.0
+        self._absorption = np.zeros(self.bands)  # Sum of S·α
+        self._log_absorption = np.zeros(self.bands)  # Sum of S·ln(1-α)
+        self._axis_area = np.zeros(3)
+        self._axis_absorption = np.zeros((3, self.bands))  # Sum of S·α of each axis
+        self._axis_alpha = np.zeros((3, self.bands))  # Sum of α of each axis
+        self._axis_count = np.zeros(3)
+        for area, alphas, axis in self.surfaces.values():
+            self._update(area, alphas, axis, 1)
+
+    def _update(self, area: float, alphas, axis: int, sign: int):
+        absorption = area * alphas
+        self._area += sign * area
+        self._absorption += sign * absorption
+        self._log_absorption += sign * area * np.log(1 - alphas)
+        self._axis_area[axis] += sign * area
+        self._axis_absorption[axis] += sign * absorption
+        self._axis_alpha[axis] += sign * alphas
+        self._axis_count[axis] += sign
+
+    def add_surface(self, area: float, alphas: list, axis: int, name=None):
+        """
+        Add a surface to the room.
+
+        Parameters:
+            area (float): Surface area [m2]
+            alphas (float or list): Absorption coefficient of each band; [0-1)
+            axis (int): Axis the surface is normal to, as in shoebox_surfaces
+                (0: side walls, 1: front and rear walls, 2: floor and ceiling)
+            name (hashable): Name of the surface; [default: next integer]
+
+        Returns:
+            name: Name of the added surface
+        """
+        if axis not in (0, 1, 2):
+            raise ValueError(f'Invalid axis {axis}; expected 0, 1 or 2.')
+        if name is None:
+            while self._next_name in self.surfaces:
+                self._next_name += 1
+            name = self._next_name
+        if name in self.surfaces:
+            raise KeyError(f'Surface {name!r} already exists.')
+        alphas = np.broadcast_to(np.asarray(alphas, dtype=np.float64), (self.bands,)).copy()
+        self.surfaces[name] = (float(area), alphas, axis)
+        self._update(float(area), alphas, axis, 1)
+        return name
+
+    def remove_surface(self, name):
+        """Remove a surface from the room."""
+        area, alphas, axis = self.surfaces.pop(name)
+        self._update(area, alphas, axis, -1)
+
+    def set_alphas(self, name, alphas: list):
+        """Change the absorption coefficients of a surface (ex: applying a treatment)."""
+        area, old, axis = self.surfaces[name]
+        alphas = np.broadcast_to(np.asarray(alphas, dtype=np.float64), (self.bands,)).copy()
+        self._update(area, old, axis, -1)
+        self._update(area, alphas, axis, 1)
+        self.surfaces[name] = (area, alphas, axis)
+
+    def set_area(self, name, area: float):
+        """Change the area of a surface."""
+        old, alphas, axis = self.surfaces[name]
+        self._update(old, alphas, axis, -1)
+        self._update(float(area), alphas, axis, 1)
+        self.surfaces[name] = (float(area), alphas, axis)
+
+    def rt(self) -> dict:
+        """
+        Reverberation times with every formula, from the cached aggregates.
+
+        Returns:
+            rt (dict): Reverberation time of each band [s], keyed by formula
+                (sabine, eyring, millington, fitzroy, arau), as given by rt_all
+        """
+        cv = rt_constant(self.c, self.decay) * self.volume
+        s_tot = self._area
+        with np.errstate(divide='ignore', invalid='ignore'):  # Axes without surfaces
+            axis_area = self._axis_area[:, None]
+            fitzroy = -axis_area / np.log(1 - self._axis_alpha / self._axis_count[:, None])
+            arau = (cv / -(s_tot * np.log(1 - self._axis_absorption / axis_area))) ** (axis_area / s_tot)
+        return {
+            'sabine': cv / self._absorption,
+            'eyring': cv / (-s_tot * np.log(1 - self._absorption / s_tot)),
+            'millington': cv / -self._log_absorption,
+            'fitzroy': cv / s_tot**2 * np.sum(np.where(self._axis_count[:, None] > 0, fitzroy, 0), axis=0),
+            'arau': np.prod(np.where(self._axis_count[:, None] > 0, arau, 1), axis=0),
+        }
@@ -0,0 +1,146 @@
+"""
+SERVER
+
+This module contains a long-running local analysis server, which keeps the interpreter,
+the filter-design cache and a worker thread pool warm between impulse-response analyses.
+
+Jobs are sent as JSON over HTTP (see cli.request, or python -m acoustician_tools analyze --server):
+    POST /analyze   {"path": "ir.wav", "bands": "octave", "metrics": ["c80", "t30"], "options": {"onset_db": -20}}
+    GET  /status
+    POST /shutdown
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from acoustician_tools import __version__
+from acoustician_tools.cache import ResultCache
+from acoustician_tools.cli import ANALYSIS_OPTIONS, DEFAULT_METRICS, parse_bands
+from acoustician_tools.filter import filter_cache_info
+from acoustician_tools.rir import analyze_ir
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') == '/status':
+            self._reply(200, self.server.status())
+        else:
+            self._reply(404, {'error': f'Unknown endpoint {self.path}'})
+
+    def do_POST(self):
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except ValueError:
+            return self._reply(400, {'error': 'Request body is not valid JSON'})
+        endpoint = self.path.rstrip('/')
+        if endpoint == '/analyze':
+            try:
+                self._reply(200, self.server.analyze(job))
+            except Exception as e:
+                self._reply(400, {'error': f'{type(e).__name__}: {e}'})
+        elif endpoint == '/shutdown':
+            self._reply(200, {'status': 'shutting down'})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self._reply(404, {'error': f'Unknown endpoint {self.path}'})
+
+    def _reply(self, code: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    HTTP server running impulse-response analyses (rir.analyze_ir) of local files.
+
+    Each request is handled in its own thread, and the bands of every job are filtered on
+    one shared thread pool. Filter designs stay in the process-wide cache between jobs, and
+    results in one result cache shared by every request thread.
+    The server only binds to the loopback interface by default; paths are read on the
+    server's machine.
+
+    Parameters:
+        host (string): Interface to bind to
+        port (int): Port to listen on; 0 picks a free port (see server_port)
+        workers (int): Number of threads filtering bands; [default: as ThreadPoolExecutor]
+        cache_path (string): Path of a result cache (see cache.ResultCache); None disables it
+        verbose (bool): Log every request to stderr
+
+    Usage:
+        server = AnalysisServer(port=8765)
+        server.serve_forever()
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 8765,
+        workers: int = None,
+        cache_path: str = None,
+        verbose: bool = False,
+    ):
+        super().__init__((host, port), _Handler)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.cache = None if cache_path is None else ResultCache(cache_path, check_same_thread=False)
+        self.verbose = verbose
+        self.started = time.time()
+        self.jobs = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def analyze(self, job: dict) -> dict:
+        """
+        Run one analysis job.
+
+        Parameters:
+            job (dict): 'path' (string), 'bands' (as accepted by cli.parse_bands), optional 'fmin'
+                and 'fmax' [Hz], 'metrics' (list) and 'options' (dict of rir.analyze_ir keyword
+                arguments among multirate, block_size, onset_db, truncate and dtype)
+
+        Returns:
+            response (dict): 'bands' and 'results' (as returned by rir.analyze_ir)
+        """
+        options = job.get('options') or {}
+        unknown = set(options) - set(ANALYSIS_OPTIONS)
+        if unknown:
+            raise ValueError(f'Unknown options {sorted(unknown)}; expected some of {list(ANALYSIS_OPTIONS)}.')
+        with self._lock:
+            self.jobs += 1
+        try:
+            bands = parse_bands(job.get('bands', 'octave'), job.get('fmin'), job.get('fmax'))
+            metrics = job.get('metrics') or DEFAULT_METRICS
+            results = analyze_ir(job['path'], bands, metrics, workers=self.executor, cache=self.cache, **options)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        return {'bands': bands, 'results': results}
+
+    def status(self) -> dict:
+        """Version, uptime [s], number of jobs and errors, and filter-design and result cache statistics."""
+        return {
+            'version': __version__,
+            'uptime': time.time() - self.started,
+            'jobs': self.jobs,
+            'errors': self.errors,
+            'filter_cache': filter_cache_info()._asdict(),
+            'result_cache': None if self.cache is None else self.cache.stats(),
+        }
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        if self.cache is not None:
+            self.cache.close()
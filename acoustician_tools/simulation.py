@@ -0,0 +1,176 @@
+"""
+SIMULATION
+
+This module contains an image-source simulator of shoebox rooms, producing impulse-responses
+that can be analysed with the rir functions, from the same per-surface, per-band absorption
+coefficients taken by the room functions.
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from acoustician_tools import room
+from acoustician_tools.utils import shoebox_surfaces
+
+# Surfaces (as ordered by shoebox_surfaces) at the lower and upper end of each axis;
+# x along the length (front and rear walls), y along the width (side walls), z along the height
+AXIS_SURFACES = ((2, 3), (0, 1), (4, 5))
+
+
+def _image_grid(length: float, source: float, limit: float, max_order: int = None):
+    """
+    Image coordinates along one axis, 2mL + (1-2q)x, with their reflections on the walls at
+    0 and at L (|m-q| and |m|); images further than limit from the room are left out.
+    """
+    reach = int(np.ceil(limit / (2 * length))) + 1
+    if max_order is not None:
+        reach = min(reach, max_order // 2 + 1)
+    m = np.repeat(np.arange(-reach, reach + 1), 2)
+    q = np.tile([0, 1], len(m) // 2)
+    return 2 * m * length + (1 - 2 * q) * source, np.abs(m - q), np.abs(m)
+
+
+def _accumulate(task: dict, x_images: slice) -> np.ndarray:
+    """
+    Impulse trains of one chunk of images (a range of x-axis images, with every y and z one),
+    as fractional-delay impulses; [receivers, bands, samples]
+    """
+    (x, x_low, x_high), (y, y_low, y_high), (z, z_low, z_high) = task['grids']
+    receivers, sr, c, n = task['receivers'], task['sr'], task['c'], task['samples']
+    grid = np.meshgrid(np.arange(len(x))[x_images], np.arange(len(y)), np.arange(len(z)), indexing='ij')
+    ix, iy, iz = (i.ravel() for i in grid)
+
+    # Reflections on each surface, in the order of shoebox_surfaces
+    counts = np.zeros((len(ix), 6))
+    for (low, high), (low_counts, high_counts), i in zip(
+        AXIS_SURFACES, [(x_low, x_high), (y_low, y_high), (z_low, z_high)], [ix, iy, iz]
+    ):
+        counts[:, low], counts[:, high] = low_counts[i], high_counts[i]
+    order = counts.sum(axis=-1)
+    positions = np.stack([x[ix], y[iy], z[iz]], axis=-1)
+    distance = np.linalg.norm(positions[:, None] - receivers, axis=-1)  # [images, receivers]
+    keep = np.any(distance < c * n / sr, axis=-1)
+    if task['max_order'] is not None:
+        keep &= order <= task['max_order']
+    counts, distance = counts[keep], distance[keep]
+
+    gain = np.exp(counts @ task['log_reflection'].T)  # Product of the reflection factors; [images, bands]
+    amplitude = gain[:, None, :] / (4 * np.pi * distance[..., None])  # [images, receivers, bands]
+    delay = distance / c * sr
+    taps = task['taps']
+    if taps:
+        start = np.floor(delay).astype(np.int64) - taps // 2 + 1
+        offset = np.arange(taps)
+        t = start[..., None] + offset - delay[..., None]  # Distance of each tap from the delay [samples]
+        kernel = np.sinc(t) * (0.5 + 0.5 * np.cos(2 * np.pi * t / taps))  # Hann-windowed sinc
+        index = start[..., None] + offset
+    else:
+        kernel = np.ones(delay.shape + (1,))
+        index = np.round(delay).astype(np.int64)[..., None]
+    valid = (index >= 0) & (index < n)
+
+    h = np.zeros((receivers.shape[0], gain.shape[-1], n))
+    for r in range(receivers.shape[0]):
+        for b in range(gain.shape[-1]):
+            weights = amplitude[:, r, b, None] * kernel[:, r]
+            h[r, b] = np.bincount(index[:, r][valid[:, r]], weights=weights[valid[:, r]], minlength=n)
+    return h
+
+
+def shoebox_ir(
+    dimensions: list,
+    source: list,
+    receiver: list,
+    alphas: list,
+    bands: list = None,
+    sr: int = 48000,
+    max_order: int = None,
+    duration: float = None,
+    c: float = 343.0,
+    taps: int = 16,
+    chunk_size: int = 100000,
+    workers: int = None,
+):
+    """
+    Simulate the impulse-response of a shoebox room with the image-source method.
+
+    Images are enumerated up to a reflection order and/or a time limit, in chunks of vectorized
+    image positions, reflection factors and fractional delays, summed into one impulse train per
+    band; chunks can be spread across worker processes. Each band's impulse train is then
+    band-limited with a brickwall mask in the frequency domain and the bands are summed, so each
+    frequency range decays with its own absorption coefficients.
+
+    Parameters:
+        dimensions (list): Length, width and height of the room [m], as in utils.shoebox_surfaces
+        source (list): Source position (x along the length, y along the width, z along the height) [m]
+        receiver (list): Receiver position [m], or list of positions, one per channel
+        alphas (1d or 2d list of floats): Absortion coefficient of each boundary, in the order of
+            utils.shoebox_surfaces, as in the room functions; [surfaces] or [bands, surfaces]
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz], one per row
+            of alphas (ex: octave_bands()['f_bound']); the lowest and highest bands are extended
+            to 0Hz and to the Nyquist frequency; [default: one band for 1d alphas]
+        sr (int): Sample rate [Hz]
+        max_order (int): Highest reflection order; None keeps every image within the duration
+        duration (float): Length of the impulse-response [s]; [default: longest Eyring RT60,
+            or the arrival of the furthest image of max_order]
+        c (float): speed of sound [m/s]
+        taps (int): Length of the windowed-sinc fractional-delay filters [samples];
+            0 rounds each arrival to the nearest sample
+        chunk_size (int): Approximate number of images evaluated at once
+        workers (int): Number of worker processes; [default: number of CPUs]
+            1 runs the simulation in the current process
+
+    Returns:
+        y (np.array): Impulse-response [Pa at 1 Pa·m source]; [samples] or [samples, receivers]
+        sr (int): Sample rate [Hz]; (y, sr) can be passed as an impulse-response to the rir functions
+    """
+    dimensions = np.asarray(dimensions, dtype=np.float64)
+    source = np.asarray(source, dtype=np.float64)
+    receivers = np.atleast_2d(np.asarray(receiver, dtype=np.float64))
+    if np.any(source < 0) or np.any(source > dimensions) or np.any(receivers < 0) or np.any(receivers > dimensions):
+        raise ValueError('Source and receivers must be inside the room.')
+    alphas = np.atleast_2d(np.asarray(alphas, dtype=np.float64))  # [bands, surfaces]
+    if bands is None:
+        if alphas.shape[0] > 1:
+            raise ValueError('Frequency bands are needed for multiband absorption coefficients.')
+        bands = [(0, sr / 2)]
+    if len(bands) != alphas.shape[0]:
+        raise ValueError(f'{len(bands)} bands given for {alphas.shape[0]} bands of absorption coefficients.')
+
+    if duration is None:
+        if max_order is None:
+            duration = np.max(room.rt_eyring(np.prod(dimensions), shoebox_surfaces(*dimensions), alphas, c=c))
+        else:
+            duration = np.linalg.norm(dimensions) * (max_order + 1) / c  # Furthest possible image
+    n = int(np.ceil(duration * sr))
+    limit = c * duration + np.linalg.norm(dimensions)
+
+    grids = [_image_grid(length, s, limit, max_order) for length, s in zip(dimensions, source)]
+    task = {
+        'grids': grids,
+        'receivers': receivers,
+        'sr': sr,
+        'c': c,
+        'samples': n,
+        'max_order': max_order,
+        'log_reflection': 0.5 * np.log(1 - np.minimum(alphas, 1 - 1e-12)),  # Pressure reflection factors
+        'taps': taps,
+    }
+    per_x = len(grids[1][0]) * len(grids[2][0])  # Images for each x-axis image
+    step = max(chunk_size // per_x, 1)
+    chunks = [slice(i, i + step) for i in range(0, len(grids[0][0]), step)]
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(chunks) == 1:
+        h = sum(_accumulate(task, chunk) for chunk in chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            h = sum(executor.map(_accumulate, [task] * len(chunks), chunks))
+
+    # Band-limit each band's impulse train and sum the bands
+    edges = np.array(bands, dtype=np.float64)
+    edges[np.argmin(edges[:, 0]), 0], edges[np.argmax(edges[:, 1]), 1] = 0, np.inf
+    frequencies = np.fft.rfftfreq(n, 1 / sr)
+    masks = (frequencies >= edges[:, :1]) & (frequencies < edges[:, 1:])  # [bands, frequencies]
+    y = np.fft.irfft(np.einsum('rbf,bf->rf', np.fft.rfft(h, axis=-1), masks), n=n, axis=-1)
+    return (y[0] if receivers.shape[0] == 1 and np.ndim(receiver) == 1 else y.T), sr
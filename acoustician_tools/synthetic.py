@@ -0,0 +1,93 @@
+"""
+SYNTHETIC
+
+This module contains functions for generating synthetic room impulse-responses with known
+decay times, for testing and benchmarking the impulse-response analysis.
+"""
+
+import numpy as np
+
+
+def _envelope(t, rt, late_rt=None, knee_db: float = -20):
+    """
+    Amplitude envelope of an exponential energy decay, optionally with a second, slower
+    decay starting knee_db below the first one (double-slope decay); [..., samples]
+    """
+    energy = 10 ** (-6 * t / rt)  # 60dB energy decay in rt seconds
+    if late_rt is not None:
+        energy = energy + 10 ** (knee_db / 10) * 10 ** (-6 * t / late_rt)
+    return np.sqrt(energy)
+
+
+def synthetic_ir(
+    bands: list,
+    rt,
+    sr: int = 48000,
+    duration: float = None,
+    predelay: float = 0.0,
+    noise_floor_db: float = None,
+    late_rt=None,
+    knee_db: float = -20,
+    channels: int = 1,
+    batch: int = None,
+    seed=None,
+):
+    """
+    Generate synthetic impulse-responses as band-limited, exponentially decaying noise.
+
+    White noise is split into bands with brickwall masks in the frequency domain, each band
+    is shaped by its own decay envelope, and the bands are summed back. Every IR, channel
+    and band is generated at once with array operations; the only loop is over bands.
+
+    Parameters:
+        bands (list): List of tuples, containing frequency bands (lower, upper) [Hz]
+            ex: octave_bands()['f_bound']; adjacent bands cover a continuous spectrum
+        rt (float or list): Reverberation time of each band (or of all of them) [s]
+        sr (int): Sample rate [Hz]
+        duration (float): Length of each IR [s]; [default: predelay plus a 90dB decay of the slowest band]
+        predelay (float): Silence before the onset [s]
+        noise_floor_db (float): Level of a stationary white noise floor, relative to the
+            initial level of the decay [dB] (ex: -60); None adds no noise
+        late_rt (float or list): Reverberation time of a second, slower decay of each band [s]
+            (double-slope decay, ex: coupled rooms); None gives a single slope
+        knee_db (float): Initial level of the second decay, relative to the first one [dB]
+        channels (int): Number of channels, with independent noise
+        batch (int): Number of impulse-responses; None generates a single one
+        seed (int or np.random.Generator): Seed for reproducible noise
+
+    Returns:
+        y (np.array): Impulse-responses, normalized to a peak of 1; [samples] or [samples, channels]
+            with a leading [batch] axis when batch is given
+        sr (int): Sample rate [Hz]; (y, sr) can be passed as an impulse-response to the rir functions
+    """
+    rng = np.random.default_rng(seed)
+    rt = np.broadcast_to(np.asarray(rt, dtype=np.float64), (len(bands),))
+    late_rt = None if late_rt is None else np.broadcast_to(np.asarray(late_rt, dtype=np.float64), (len(bands),))
+    if duration is None:
+        duration = predelay + 1.5 * np.max(rt if late_rt is None else np.maximum(rt, late_rt))
+
+    onset = int(predelay * sr)
+    n = int(duration * sr) - onset
+    shape = (batch or 1, channels)
+    spectrum = np.fft.rfft(rng.standard_normal(shape + (n,)), axis=-1)
+    bins = np.fft.rfftfreq(n, 1 / sr)
+    t = np.arange(n) / sr
+
+    y = np.zeros(shape + (n,))
+    power = 0.0  # Initial power of the decay
+    for b, (lower, upper) in enumerate(bands):
+        inside = (bins >= lower) & (bins < upper)
+        band = np.fft.irfft(np.where(inside, spectrum, 0), n=n, axis=-1)
+        envelope = _envelope(t, rt[b], None if late_rt is None else late_rt[b], knee_db)
+        y += band * envelope
+        power += envelope[0] ** 2 * np.count_nonzero(inside) / len(bins)
+
+    y = np.concatenate([np.zeros(shape + (onset,)), y], axis=-1)
+    if noise_floor_db is not None:
+        y += np.sqrt(power * 10 ** (noise_floor_db / 10)) * rng.standard_normal(y.shape)
+    y /= np.max(np.abs(y), axis=-1, keepdims=True)
+
+    y = np.moveaxis(y, 1, -1)  # Samples, channels
+    if channels == 1:
+        y = y[..., 0]
+    return (y if batch else y[0]), sr
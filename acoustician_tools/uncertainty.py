@@ -0,0 +1,143 @@
+"""
+UNCERTAINTY
+
+This module contains a Monte Carlo propagation of the uncertainty of absorption coefficients,
+surface areas and sound speed through the theoretical reverberation time formulas.
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from acoustician_tools import room
+
+REFERENCE_SOUND_SPEED = 343.0  # RT is inversely proportional to the sound speed; samples are scaled from it
+
+
+def _sample(rng, mean, spread, distribution: str, size):
+    """Samples of a quantity, as normal (spread: standard deviation) or uniform (spread: half-width)."""
+    if distribution == 'normal':
+        return mean + spread * rng.standard_normal(size)
+    if distribution == 'uniform':
+        return mean + spread * rng.uniform(-1, 1, size)
+    raise ValueError(f'Unknown distribution {distribution!r}; expected normal or uniform.')
+
+
+def _simulate_chunk(task: dict, seed, n: int) -> dict:
+    """RT of n samples with every formula; [samples, bands] each, as float32."""
+    rng = np.random.default_rng(seed)
+    alphas, surfaces = task['alphas'], task['surfaces']
+    bands = (1,) * (alphas.ndim - 1)  # Band axis of each sample, if any
+    sampled_alphas = _sample(rng, alphas, task['alpha_spread'], task['distribution'], (n,) + alphas.shape)
+    sampled_alphas = np.clip(sampled_alphas, 0, task['max_alpha'])
+    scales = _sample(rng, 1, task['surface_spread'], task['distribution'], (n,) + bands + surfaces.shape[-1:])
+    sampled_surfaces = surfaces * np.maximum(scales, 0)
+    c = _sample(rng, task['c'], task['c_spread'], task['distribution'], (n,) + bands)
+
+    scale = REFERENCE_SOUND_SPEED / c
+    if task['formulas'] == list(room.RT_FORMULAS):
+        rt = room.rt_all(task['volume'], sampled_surfaces, sampled_alphas, task['decay'], REFERENCE_SOUND_SPEED)
+    else:
+        rt = {
+            f: getattr(room, f'rt_{f}')(
+                task['volume'], sampled_surfaces, sampled_alphas, task['decay'], REFERENCE_SOUND_SPEED
+            )
+            for f in task['formulas']
+        }
+    return {f: (rt[f] * scale).astype(np.float32) for f in task['formulas']}
+
+
+def rt_uncertainty(
+    volume: float,
+    surfaces: list,
+    alphas: list,
+    alpha_spread=0.05,
+    surface_spread: float = 0.0,
+    c: float = 343.0,
+    c_spread: float = 0.0,
+    distribution: str = 'normal',
+    formula='eyring',
+    samples: int = 1000000,
+    percentiles: list = (2.5, 50, 97.5),
+    chunk_size: int = 50000,
+    workers: int = None,
+    seed=None,
+    decay: int = 60,
+    max_alpha: float = 0.99,
+) -> dict:
+    """
+    Estimate the uncertainty of theoretical reverberation times with a Monte Carlo simulation.
+
+    Absorption coefficients, surface areas and sound speed are sampled independently, and the
+    samples are pushed through the rt_ formulas in vectorized chunks, so the memory used by
+    the inputs does not grow with the number of samples (only the sampled RTs are kept, as
+    float32). Each chunk draws from its own seed, spawned from the given one, so results
+    do not depend on the number of workers.
+
+    Parameters:
+        volume (float): Total volume of the room [m3]
+        surfaces (list of floats): Surface area of each boundary [m2]
+        alphas (1d or 2d list of floats): Nominal absorption coefficient for each boundary, as in
+            the rt_ functions; [surfaces] or [bands, surfaces]
+        alpha_spread (float or list): Uncertainty of the absorption coefficients, broadcast
+            to the shape of alphas (ex: per band); sampled values are clipped to [0, max_alpha]
+        surface_spread (float): Relative uncertainty of each surface area (ex: 0.05 for 5%)
+        c (float): Nominal speed of sound [m/s]
+        c_spread (float): Uncertainty of the speed of sound [m/s]
+        distribution (string): normal (spreads are standard deviations) or uniform (spreads
+            are half-widths)
+        formula (string or list): Reverberation formula; sabine, eyring, millington, fitzroy
+            or arau, or a list of them
+        samples (int): Number of Monte Carlo samples
+        percentiles (list): Percentiles to report [0-100]
+        chunk_size (int): Number of samples evaluated at once
+        workers (int): Number of worker processes; [default: number of CPUs]
+            1 runs the simulation in the current process
+        seed (int or np.random.SeedSequence): Seed for reproducible results
+        decay (int): intensity drop for computing reverberation time [dB]
+        max_alpha (float): Upper limit of the sampled absorption coefficients
+
+    Returns:
+        results (dict): For each band; nominal (RT of the nominal values), mean and std [s],
+            and percentiles, as a dict of percentile: values [s]
+            (keyed by formula when a list of formulas is given)
+    """
+    formulas = [formula] if isinstance(formula, str) else list(formula)
+    unknown = set(formulas) - set(room.RT_FORMULAS)
+    if unknown:
+        raise ValueError(f'Unknown formulas {sorted(unknown)}; expected some of {room.RT_FORMULAS}.')
+    alphas = np.asarray(alphas, dtype=np.float64)
+    task = {
+        'volume': float(volume),
+        'surfaces': np.asarray(surfaces, dtype=np.float64),
+        'alphas': alphas,
+        'alpha_spread': np.broadcast_to(np.asarray(alpha_spread, dtype=np.float64), alphas.shape),
+        'surface_spread': surface_spread,
+        'c': c,
+        'c_spread': c_spread,
+        'distribution': distribution,
+        'formulas': [f for f in room.RT_FORMULAS if f in formulas],
+        'decay': decay,
+        'max_alpha': max_alpha,
+    }
+
+    sizes = [min(chunk_size, samples - start) for start in range(0, samples, chunk_size)]
+    seeds = (seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)).spawn(len(sizes))
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(sizes) == 1:
+        chunks = [_simulate_chunk(task, s, n) for s, n in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(_simulate_chunk, [task] * len(sizes), seeds, sizes))
+
+    nominal = room.rt_all(volume, surfaces, alphas, decay, c)
+    results = {}
+    for f in formulas:
+        rt = np.concatenate([chunk[f] for chunk in chunks]) if chunks else np.empty((0,) + alphas.shape[:-1])
+        values = np.percentile(rt, percentiles, axis=0)
+        results[f] = {
+            'nominal': np.asarray(nominal[f]).tolist(),
+            'mean': rt.mean(axis=0, dtype=np.float64).tolist(),
+            'std': rt.std(axis=0, dtype=np.float64).tolist(),
+            'percentiles': {p: np.asarray(v, dtype=np.float64).tolist() for p, v in zip(percentiles, values)},
+        }
+    return results[formula] if isinstance(formula, str) else results
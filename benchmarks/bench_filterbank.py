@@ -0,0 +1,62 @@
+"""
+FILTERBANK BENCHMARK
+
+Compares the per-band filtering loop previously used in rir against butter_filterbank
+and multirate_filterbank.
+
+Usage:
+    python benchmarks/bench_filterbank.py [--fs 96000] [--duration 10] [--repeat 3]
+"""
+
+import sys
+
+sys.path.append('.')
+
+import argparse
+import numpy as np
+from scipy import signal
+
+from acoustician_tools.bands import octave_bands, third_octave_bands
+from acoustician_tools.filter import butter_filterbank, multirate_filterbank, clear_filter_cache
+from suite import best_time
+
+
+def per_band_loop(data, bands, fs, order=5):
+    # Previous rir behaviour: design and filter each band separately, collecting a list
+    nyq = 0.5 * fs
+    out = []
+    for b in bands:
+        sos = signal.butter(order, [b[0] / nyq, b[1] / nyq], btype='band', output='sos')
+        out.append(signal.sosfilt(sos, data))
+    return np.asarray(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fs', type=int, default=96000)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = (rng.standard_normal(int(args.fs * args.duration)) * 2**14).astype(np.int16)
+
+    octave = octave_bands()['f_bound']
+    workloads = [
+        ('octave', octave),
+        ('third-octave', third_octave_bands()['f_bound']),
+        ('octave <250Hz', octave[:4]),
+    ]
+
+    print(f'{"bands":<16}{"loop [s]":>10}{"filterbank [s]":>16}{"multirate [s]":>15}')
+    for name, bands in workloads:
+        bands = [b for b in bands if b[1] < args.fs / 2]
+        loop = best_time(per_band_loop, args.repeat, data, bands, args.fs)
+        clear_filter_cache()
+        bank = best_time(butter_filterbank, args.repeat, data, bands, args.fs)
+        multirate = best_time(multirate_filterbank, args.repeat, data, bands, args.fs)
+        print(f'{name:<16}{loop:>10.3f}{bank:>16.3f}{multirate:>15.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+IMPORT BENCHMARK
+
+Times importing each module in a fresh interpreter, and lists the heavy dependencies
+(numpy, scipy) it loads; the package and its command-line interface should load neither.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5]
+"""
+
+import sys
+
+sys.path.append('.')
+
+import argparse
+import subprocess
+
+MODULES = [
+    'acoustician_tools',
+    'acoustician_tools.cli',
+    'acoustician_tools.profiling',
+    'acoustician_tools.bands',
+    'acoustician_tools.room',
+    'acoustician_tools.filter',
+    'acoustician_tools.rir',
+    'acoustician_tools.server',
+]
+
+CODE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(m for m in ('numpy', 'scipy.signal', 'scipy.io') if m in sys.modules))
+'''
+
+
+def import_time(module: str, repeat: int):
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', CODE.format(module=module)], capture_output=True, text=True, check=True
+        ).stdout.split()
+        times.append(float(output[0]))
+    return min(times), output[1] if len(output) > 1 else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"module":<32}{"import [ms]":>12}  loads')
+    for module in MODULES:
+        elapsed, loaded = import_time(module, args.repeat)
+        print(f'{module:<32}{elapsed * 1000:>12.1f}  {loaded}')
+
+
+if __name__ == '__main__':
+    main()
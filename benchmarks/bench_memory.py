@@ -0,0 +1,46 @@
+"""
+MEMORY BENCHMARK
+
+Compares time and peak memory of RT60 calculations with float64 and float32 Schroeder curves.
+
+Usage:
+    python benchmarks/bench_memory.py [--fs 48000] [--duration 30] [--repeat 3]
+"""
+
+import sys
+
+sys.path.append('.')
+
+import argparse
+import numpy as np
+
+from acoustician_tools.bands import octave_bands
+from acoustician_tools.rir import rt60_from_ir
+from acoustician_tools.synthetic import synthetic_ir
+from suite import best_time, peak_memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fs', type=int, default=48000)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    bands = [b for b in octave_bands()['f_bound'] if b[1] < args.fs / 2]
+    y, _ = synthetic_ir(bands, 8.0, args.fs, args.duration, seed=0)  # RT60 of 8s
+    signal_mb = y.nbytes / 1e6
+
+    results = {}
+    print(f'{"dtype":>8}{"time [s]":>12}{"peak [MB]":>12}{"x signal":>10}')
+    for dtype in ['float64', 'float32']:
+        elapsed = best_time(rt60_from_ir, args.repeat, (y, args.fs), bands, 't30', dtype=dtype)
+        peak = peak_memory(rt60_from_ir, (y, args.fs), bands, 't30', dtype=dtype) / 1e6
+        results[dtype] = np.array(rt60_from_ir((y, args.fs), bands, 't30', dtype=dtype))
+        print(f'{dtype:>8}{elapsed:>12.3f}{peak:>12.1f}{peak / signal_mb:>9.1f}x')
+
+    print(f'Largest RT60 difference: {np.max(np.abs(results["float32"] - results["float64"])):.2e}s')
+
+
+if __name__ == '__main__':
+    main()
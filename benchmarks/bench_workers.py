@@ -0,0 +1,46 @@
+"""
+WORKERS BENCHMARK
+
+Measures how rir metrics scale with the number of threads processing bands concurrently.
+
+Usage:
+    python benchmarks/bench_workers.py [--fs 96000] [--duration 10] [--max-workers 16] [--repeat 3]
+"""
+
+import sys
+
+sys.path.append('.')
+
+import argparse
+import os
+
+from acoustician_tools.bands import third_octave_bands
+from acoustician_tools.rir import analyze_ir
+from acoustician_tools.synthetic import synthetic_ir
+from suite import best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fs', type=int, default=96000)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    bands = [b for b in third_octave_bands()['f_bound'] if b[1] < args.fs / 2]
+    y, _ = synthetic_ir(bands, 2.0, args.fs, args.duration, seed=0)  # RT60 of 2s
+    metrics = ['c50', 'c80', 'd50', 'edt', 't20', 't30']
+
+    workers = 1
+    baseline = None
+    print(f'{"workers":>8}{"time [s]":>12}{"speedup":>10}')
+    while workers <= args.max_workers:
+        elapsed = best_time(analyze_ir, args.repeat, (y, args.fs), bands, metrics, workers=workers)
+        baseline = baseline or elapsed
+        print(f'{workers:>8}{elapsed:>12.3f}{baseline / elapsed:>9.2f}x')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+BENCHMARK SUITE
+
+Times every module on synthetic workloads, recording the best time and peak memory of each
+benchmark to a JSON file, and compares two such files to flag regressions.
+
+Usage:
+    python benchmarks/suite.py run [--output results.json] [--filter rir] [--repeat 3] [--quick]
+    python benchmarks/suite.py compare baseline.json results.json [--threshold 0.1]
+
+The comparison exits with status 1 if any benchmark got slower, or used more memory, by
+more than the threshold (a fraction of the baseline value).
+"""
+
+import sys
+
+sys.path.append('.')
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+
+import acoustician_tools
+from acoustician_tools.absorber import porous_absorber
+from acoustician_tools.bands import octave_bands, third_octave_bands
+from acoustician_tools.diffuser import qrd_diffuser_parameters
+from acoustician_tools.rir import analyze_ir
+from acoustician_tools.synthetic import synthetic_ir
+from acoustician_tools import room
+
+
+def best_time(func, repeat, *args, **kwargs):
+    """Shortest of several runs of a function [s]; the one-off benchmark scripts share it."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(func, *args, **kwargs):
+    """Peak memory allocated by Python and numpy during one run of a function [bytes]."""
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def rir_benchmarks(scale: float) -> dict:
+    """analyze_ir over IR length, sample rate, channel count and band count, one at a time from a base case."""
+    base = {'fs': 48000, 'duration': 5.0 * scale, 'channels': 1, 'bands': 'octave'}
+    cases = [base]
+    cases += [{**base, 'duration': d * scale} for d in (1.0, 20.0)]
+    cases += [{**base, 'fs': 96000}]
+    cases += [{**base, 'channels': 4}]
+    cases += [{**base, 'bands': 'third_octave'}]
+
+    benchmarks = {}
+    for case in cases:
+        bands = octave_bands() if case['bands'] == 'octave' else third_octave_bands()
+        bands = [b for b in bands['f_bound'] if b[1] < case['fs'] / 2]
+        # Broadband decay of 75dB over the IR, which the low bands of the shortest IRs still resolve
+        rt = case['duration'] * 60 / 75
+        y, _ = synthetic_ir([(0, case['fs'] / 2)], rt, case['fs'], case['duration'], channels=case['channels'], seed=0)
+        name = 'rir.analyze_ir[{fs}Hz,{duration:g}s,{channels}ch,{bands}]'.format(**case)
+        benchmarks[name] = (lambda y=y, fs=case['fs'], bands=bands: analyze_ir((y, fs), bands), case)
+    return benchmarks
+
+
+def room_benchmarks(scale: float) -> dict:
+    """Every RT formula on a large batch of absorption coefficients; [rows, surfaces]"""
+    rows = int(200000 * scale)
+    rng = np.random.default_rng(0)
+    alphas = rng.uniform(0.01, 0.9, (rows, 6))
+    dimensions = [10.0, 7.0, 4.0]
+    volume, surfaces = np.prod(dimensions), room.shoebox_surfaces(*dimensions)
+
+    formulas = ['rt_sabine', 'rt_eyring', 'rt_millington', 'rt_fitzroy', 'rt_arau', 'rt_all']
+    return {
+        f'room.{f}[{rows}x6]': (lambda func=getattr(room, f): func(volume, surfaces, alphas), {'rows': rows})
+        for f in formulas
+    }
+
+
+def absorber_benchmarks(scale: float) -> dict:
+    """porous_absorber on a dense frequency grid."""
+    points = int(1000000 * scale)
+    frequencies = np.linspace(20, 20000, points)
+    return {
+        f'absorber.porous_absorber[{points}f]': (
+            lambda: porous_absorber(10000, 50, frequencies),
+            {'frequencies': points},
+        )
+    }
+
+
+def diffuser_benchmarks(scale: float) -> dict:
+    """qrd_diffuser_parameters over many design frequencies and prime generators (warnings silenced)."""
+    frequencies = np.linspace(200, 2000, max(int(100 * scale), 1))
+    designs = [(f, n, m) for f in frequencies for n in (7, 11, 13, 17) for m in (0, 1)]
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for f, n, m in designs:
+                qrd_diffuser_parameters(f, 5, n, m)
+
+    return {f'diffuser.qrd_diffuser_parameters[{len(designs)}]': (run, {'designs': len(designs)})}
+
+
+def collect(scale: float) -> dict:
+    benchmarks = {}
+    for group in (rir_benchmarks, room_benchmarks, absorber_benchmarks, diffuser_benchmarks):
+        benchmarks.update(group(scale))
+    return benchmarks
+
+
+def run(args):
+    benchmarks = collect(0.1 if args.quick else 1.0)
+    results = {}
+    print(f'{"benchmark":<56}{"time [s]":>12}{"peak [MB]":>12}')
+    for name, (func, params) in benchmarks.items():
+        if args.filter and args.filter not in name:
+            continue
+        func()  # Warm up caches (ex: filter designs)
+        results[name] = {'time': best_time(func, args.repeat), 'peak_memory': peak_memory(func), 'params': params}
+        print(f'{name:<56}{results[name]["time"]:>12.4f}{results[name]["peak_memory"] / 1e6:>12.1f}')
+
+    report = {
+        'meta': {
+            'version': acoustician_tools.__version__,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': args.repeat,
+            'quick': args.quick,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {args.output}')
+
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    with open(args.current) as f:
+        current = json.load(f)['results']
+
+    regressions = 0
+    print(f'{"benchmark":<56}{"time":>10}{"memory":>10}')
+    for name in sorted(set(baseline) & set(current)):
+        changes = {k: current[name][k] / baseline[name][k] - 1 for k in ('time', 'peak_memory') if baseline[name][k]}
+        flagged = [k for k, change in changes.items() if change > args.threshold]
+        regressions += bool(flagged)
+        time_change, memory_change = changes.get('time', 0), changes.get('peak_memory', 0)
+        print(f'{name:<56}{time_change:>+10.1%}{memory_change:>+10.1%}' + ('  REGRESSION' if flagged else ''))
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f'{name:<56}{"only in " + ("baseline" if name in baseline else "current"):>20}')
+
+    print(f'{regressions} regression(s) beyond {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks and record the results')
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.add_argument('--filter', default=None, help='Only run benchmarks whose name contains this text')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--quick', action='store_true', help='Workloads 10 times smaller')
+
+    compare_parser = commands.add_parser('compare', help='Compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == '__main__':
+    main()
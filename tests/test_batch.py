@@ -0,0 +1,66 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from scipy.io import wavfile
+
+from acoustician_tools.batch import *
+from acoustician_tools.results import records
+from acoustician_tools.rir import analyze_ir
+from acoustician_tools.bands import octave_bands
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.bands = octave_bands()['f_bound'][3:8]
+        self.metrics = ['c80', 'd50', 't20']
+
+    def test_analyze_batch(self):
+        paths = ['tests/IR/IR_test_big_hall.wav', 'tests/IR/missing.wav', 'tests/IR/IR_test.wav']
+        calls = []
+        table = analyze_batch(paths, self.bands, self.metrics, workers=2, progress=lambda *args: calls.append(args))
+
+        self.assertEqual(len(table), len(paths) * len(self.bands) * len(self.metrics))
+        self.assertEqual([row['path'] for row in table[:: len(self.bands) * len(self.metrics)]], paths)
+        self.assertEqual(sorted(c[0] for c in calls), [1, 2, 3], msg='Progress reported for every file')
+
+        expected = analyze_ir(paths[0], self.bands, self.metrics)
+        for m in self.metrics:
+            calculated = [row['value'] for row in table if row['path'] == paths[0] and row['metric'] == m]
+            np.testing.assert_almost_equal(calculated, expected[m], err_msg=m)
+
+        failed = [row for row in table if row['path'] == paths[1]]
+        self.assertTrue(all(np.isnan(row['value']) for row in failed))
+        self.assertTrue(all(row['error'].startswith('FileNotFoundError') for row in failed))
+
+    def test_multichannel(self):
+        sr, y = wavfile.read('tests/IR/IR_test_big_hall.wav')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stereo.wav')
+            wavfile.write(path, sr, np.stack([y, y // 2], axis=-1))
+            table = analyze_batch([path], self.bands, self.metrics, workers=1)
+            expected = analyze_ir(path, self.bands, self.metrics)
+
+        self.assertEqual(len(table), 2 * len(self.bands) * len(self.metrics), msg='One row per channel')
+        self.assertTrue(all(np.isscalar(row['value']) for row in table))
+        for m in self.metrics:
+            for c in range(2):
+                calculated = [row['value'] for row in table if row['metric'] == m and row['channel'] == c]
+                np.testing.assert_almost_equal(calculated, np.asarray(expected[m])[:, c], err_msg=f'{m} {c}')
+        self.assertEqual(records(table).value.dtype, np.float64)
+
+    def test_glob(self):
+        table = analyze_batch('tests/IR/*.wav', self.bands, ['c50'], workers=1)
+        self.assertEqual(
+            sorted(set(row['path'] for row in table)),
+            ['tests/IR/IR_test.wav', 'tests/IR/IR_test_big_hall.wav'],
+        )
+        self.assertTrue(all(row['error'] is None for row in table))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from acoustician_tools.cache import *
+from acoustician_tools.rir import analyze_ir, rt60_from_ir
+from acoustician_tools.bands import octave_bands
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.sqlite')
+        self.bands = octave_bands()['f_bound'][3:8]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_result_cache(self):
+        cache = ResultCache(self.path)
+        ir = 'tests/IR/IR_test_big_hall.wav'
+        expected = analyze_ir(ir, self.bands, ['c80', 't20'])
+
+        self.assertEqual(analyze_ir(ir, self.bands, ['c80', 't20'], cache=cache), expected)
+        self.assertEqual(cache.stats()['misses'], 2)
+        self.assertEqual(analyze_ir(ir, self.bands, ['c80', 't20'], cache=cache), expected)
+        self.assertEqual(rt60_from_ir(ir, self.bands, 't20', cache=cache), expected['t20'])
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 2, 'hit_ratio': 0.6, 'entries': 2})
+
+        with open(ir, 'rb') as f:
+            self.assertEqual(analyze_ir(f.read(), self.bands, ['t20'], cache=cache), {'t20': expected['t20']})
+        self.assertEqual(cache.stats()['hits'], 4, msg='Same content from bytes is a hit')
+
+        analyze_ir(ir, self.bands[:2], ['t20'], cache=cache)
+        analyze_ir(ir, self.bands, ['t20'], multirate=True, cache=cache)
+        self.assertEqual(cache.stats()['entries'], 4, msg='Bands and settings are part of the key')
+
+    def test_eviction_and_versions(self):
+        cache = ResultCache(self.path, max_entries=2)
+        for i in range(3):
+            cache.put(str(i), [i])
+        self.assertIsNone(cache.get('0'), msg='Least recently used entry evicted')
+        self.assertEqual(cache.get('2'), [2])
+        cache.close()
+
+        cache = ResultCache(self.path, version='new')
+        self.assertEqual(cache.stats()['entries'], 0, msg='Entries from other versions are dropped')
+
+    def test_content_digest(self):
+        y = np.arange(10.0)
+        self.assertEqual(content_digest((y, 48000))[1], content_digest((y.copy(), 48000))[1])
+        self.assertNotEqual(content_digest((y, 48000))[1], content_digest((y, 44100))[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import io
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from acoustician_tools.cli import *
+from acoustician_tools.server import AnalysisServer
+from acoustician_tools.rir import analyze_ir
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.path = 'tests/IR/IR_test.wav'
+        self.bands = [(707.107, 1414.214), (1414.214, 2828.427)]
+
+    def test_parse_bands(self):
+        self.assertEqual(parse_bands('octave', 1000, 2000), self.bands)
+        self.assertEqual(parse_bands('707.107-1414.214,1414.214-2828.427'), self.bands)
+        self.assertEqual(len(parse_bands('third_octave', 100, 5000)), 16)
+        with self.assertRaises(ValueError):
+            parse_bands('octaves')
+
+    def test_lazy_imports(self):
+        code = 'import sys, acoustician_tools.cli; print(sorted({"numpy", "scipy"} & set(sys.modules)))'
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '[]', msg='The command-line interface starts without numpy or scipy')
+
+    def test_analyze(self):
+        expected = analyze_ir(self.path, self.bands, ['c80', 't30'])
+        arguments = ['--bands', 'octave', '--fmin', '1000', '--fmax', '2000', '--metrics', 'c80', 't30']
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            code = main(['analyze', self.path] + arguments)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(stdout.getvalue())['files'][self.path], expected)
+
+        server = AnalysisServer(port=0, workers=2)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f'http://127.0.0.1:{server.server_port}'
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                code = main(['analyze', self.path, 'missing.wav', '--server', url] + arguments)
+            files = json.loads(stdout.getvalue())['files']
+            self.assertEqual(code, 1, msg='A file failed')
+            self.assertEqual(files[self.path], expected)
+            self.assertIn('FileNotFoundError', files['missing.wav']['error'])
+
+            response = request(url, 'analyze', {'path': self.path, 'bands': self.bands, 'options': {'workers': 4}})
+            self.assertIn('Unknown options', response['error'])
+            self.assertEqual(request(url, 'status')['jobs'], 2, msg='Invalid jobs are rejected before running')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_server_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            server = AnalysisServer(port=0, cache_path=os.path.join(tmp, 'results.sqlite'))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                url = f'http://127.0.0.1:{server.server_port}'
+                job = {'path': self.path, 'bands': self.bands, 'metrics': ['c80', 't30']}
+                first, second = request(url, 'analyze', job), request(url, 'analyze', job)
+                self.assertEqual(first, second)
+                stats = request(url, 'status')['result_cache']
+                self.assertEqual((stats['hits'], stats['misses']), (2, 2), msg='One cache kept warm across requests')
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
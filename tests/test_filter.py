@@ -0,0 +1,63 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import unittest
+import numpy as np
+from scipy import signal
+
+from acoustician_tools.filter import *
+from acoustician_tools.bands import octave_bands
+
+
+class TestFilter(unittest.TestCase):
+    def setUp(self):
+        clear_filter_cache()
+
+    def test_butter_bandpass(self):
+        expected = signal.butter(5, [500 / 24000, 1000 / 24000], btype='band', output='sos')
+        np.testing.assert_array_equal(butter_bandpass(500, 1000, 48000, order=5), expected)
+
+        expected = signal.butter(4, 1000 / 24000, btype='low', output='sos')
+        np.testing.assert_array_equal(butter_bandpass(500, 1000, 48000, order=4, btype='low'), expected)
+
+        with self.assertRaises(ValueError, msg='Invalid filter type'):
+            butter_bandpass(500, 1000, 48000, btype='comb')
+
+    def test_filter_cache(self):
+        sos = butter_bandpass(500, 1000, 48000)
+        self.assertIs(butter_bandpass(500.0, 1000.0, 48000.0), sos, msg='Cached design is reused')
+        self.assertEqual((filter_cache_info().hits, filter_cache_info().misses), (1, 1))
+
+        with self.assertRaises(ValueError, msg='Cached designs are read-only'):
+            sos[0, 0] = 0.0
+
+        bands = octave_bands()['f_bound']
+        warm_filter_cache(bands, 48000, order=8)
+        self.assertEqual(filter_cache_info().currsize, len(bands) + 1)
+        butter_bandpass_filter(np.zeros(16), *bands[3], 48000, order=8)
+        self.assertEqual(filter_cache_info().hits, 2, msg='Warmed design is a cache hit')
+
+        clear_filter_cache()
+        self.assertEqual(filter_cache_info().currsize, 0)
+
+    def test_butter_filterbank(self):
+        data = np.random.default_rng(0).standard_normal(4800)
+        bands = octave_bands()['f_bound'][3:8]
+        calculated = butter_filterbank(data, bands, 48000, order=5)
+        self.assertEqual(calculated.shape, (len(bands), len(data)))
+        for y, b in zip(calculated, bands):
+            np.testing.assert_array_equal(y, butter_bandpass_filter(data, b[0], b[1], 48000, order=5))
+
+    def test_multirate_filterbank(self):
+        data = np.random.default_rng(0).standard_normal(48000)
+        bands = octave_bands()['f_bound'][1:]
+        calculated = multirate_filterbank(data, bands, 48000, order=5)
+        self.assertEqual([fs for _, fs in calculated][:3], [1500, 3000, 6000])
+        self.assertEqual(calculated[-1][1], 48000, msg='High bands are not decimated')
+        for y, fs in calculated:
+            self.assertEqual(len(y), fs, msg='One second of signal at the reduced rate')
+
+
+if __name__ == '__main__':
+    unittest.main()
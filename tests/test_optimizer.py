@@ -0,0 +1,71 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import itertools
+import unittest
+import numpy as np
+
+from acoustician_tools.optimizer import *
+from acoustician_tools.room import rt_eyring
+from acoustician_tools.utils import shoebox_surfaces
+
+
+class TestOptimizer(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.catalogue = {
+            f'material_{i}': {'alphas': rng.uniform(0.02, 0.9, 6).round(2), 'cost': float(rng.integers(0, 50))}
+            for i in range(5)
+        }
+        self.catalogue['material_0']['max_area'] = 60
+        self.volume, self.surfaces = 280, shoebox_surfaces(10, 7, 4)
+        self.target = np.array([1.2, 1.0, 0.9, 0.8, 0.8, 0.8])
+
+    def test_pareto_front(self):
+        results = optimize_treatment(self.volume, self.surfaces, self.target, self.catalogue, workers=1, batch_size=25)
+        self.assertTrue(results['complete'])
+        self.assertGreater(results['pruned'], 0)
+
+        # Brute force over every assignment meeting the area limit
+        names = list(self.catalogue)
+        alphas = np.array([self.catalogue[n]['alphas'] for n in names])
+        costs = np.array([self.catalogue[n]['cost'] for n in names])
+        assignments = np.array(list(itertools.product(range(len(names)), repeat=6)))
+        assignments = assignments[((assignments == 0) * self.surfaces).sum(axis=-1) <= 60]
+        rt = rt_eyring(self.volume, self.surfaces, np.swapaxes(alphas[assignments], 1, 2))
+        deviation = np.max(np.abs(rt - self.target) / (0.1 * self.target), axis=-1)
+        cost = (costs[assignments] * self.surfaces).sum(axis=-1)
+        front = sorted(
+            (c, d)
+            for d, c in set(zip(deviation, cost))
+            if not np.any((deviation <= d) & (cost <= c) & ((deviation < d) | (cost < c)))
+        )
+
+        solutions = results['solutions']
+        np.testing.assert_allclose([(s['cost'], s['deviation']) for s in solutions], front)
+        for s in solutions:
+            alphas_s = np.array([self.catalogue[m]['alphas'] for m in s['materials']]).T
+            np.testing.assert_allclose(s['rt'], rt_eyring(self.volume, self.surfaces, alphas_s))
+        self.assertEqual([s['within_tolerance'] for s in solutions], [s['deviation'] <= 1 for s in solutions])
+
+        parallel = optimize_treatment(self.volume, self.surfaces, self.target, self.catalogue, workers=2, batch_size=25)
+        self.assertEqual([s['cost'] for s in parallel['solutions']], [s['cost'] for s in solutions])
+
+    def test_constraints(self):
+        allowed = {4: ['material_1'], 5: ['material_1', 'material_2']}  # Floor and ceiling
+        results = optimize_treatment(
+            self.volume, self.surfaces, self.target, self.catalogue, formula='fitzroy', allowed=allowed, workers=1
+        )
+        for s in results['solutions']:
+            self.assertEqual(s['materials'][4], 'material_1')
+            self.assertIn(s['materials'][5], allowed[5])
+
+        results = optimize_treatment(self.volume, self.surfaces, self.target, self.catalogue, budget=0, workers=1)
+        self.assertFalse(results['complete'])
+        with self.assertRaises(ValueError):
+            optimize_treatment(self.volume, self.surfaces, self.target[:3], self.catalogue)
+
+
+if __name__ == '__main__':
+    unittest.main()
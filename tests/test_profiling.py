@@ -0,0 +1,73 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import os
+import json
+import tempfile
+import unittest
+
+from acoustician_tools.profiling import *
+from acoustician_tools.batch import analyze_batch
+from acoustician_tools.rir import analyze_ir
+from acoustician_tools.bands import octave_bands
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.bands = octave_bands()['f_bound'][4:8]
+        self.path = 'tests/IR/IR_test.wav'
+
+    def test_stages(self):
+        with Profiler() as profiler:
+            expected = analyze_ir(self.path, self.bands, ['c80', 't30'], truncate=True)
+        self.assertEqual(analyze_ir(self.path, self.bands, ['c80', 't30'], truncate=True), expected)
+
+        summary = profiler.summary()
+        for name in ['read', 'onset', 'filter', 'truncation', 'schroeder', 'regression']:
+            self.assertIn(name, summary)
+        self.assertEqual(summary['read']['calls'], 1)
+        self.assertEqual(profiler.records[0]['tags']['source'], self.path)
+
+        by_band = profiler.summary(by='band')
+        for band in self.bands:
+            self.assertEqual(by_band[('schroeder', tuple(band))]['calls'], 1)
+
+        with stage('read'):  # No profiler active
+            pass
+        self.assertEqual(profiler.summary()['read']['calls'], 1)
+
+    def test_sources(self):
+        paths = ['tests/IR/IR_test.wav', 'tests/IR/IR_test_big_hall.wav']
+        with Profiler() as profiler:
+            analyze_batch(paths, self.bands, ['c80', 't30'], workers=1)
+            analyze_ir(paths[0], self.bands, ['t20'], workers=2)
+
+        self.assertTrue(all(r['tags'].get('source') in paths for r in profiler.records), msg='Every stage by file')
+        by_source = profiler.summary(by='source')
+        for name in ['read', 'filter', 'schroeder', 'regression', 'energy_index']:
+            self.assertIn((name, paths[1]), by_source)
+        self.assertEqual(by_source[('filter', paths[1])]['calls'], 2 * len(self.bands))
+        self.assertEqual(by_source[('schroeder', paths[0])]['calls'], 2 * len(self.bands), msg='Also in worker threads')
+
+    def test_export(self):
+        received = []
+        with Profiler(memory=True, callback=received.append) as profiler:
+            analyze_ir(self.path, self.bands, ['t20'], workers=2)
+        self.assertEqual(received, profiler.records)
+        self.assertTrue(all(r['memory'] is not None for r in profiler.records))
+
+        with tempfile.TemporaryDirectory() as folder:
+            profiler.to_json(os.path.join(folder, 'profile.json'))
+            profiler.to_chrome_trace(os.path.join(folder, 'trace.json'))
+            with open(os.path.join(folder, 'profile.json')) as f:
+                report = json.load(f)
+            with open(os.path.join(folder, 'trace.json')) as f:
+                trace = json.load(f)
+        self.assertEqual(len(report['records']), len(profiler.records))
+        self.assertEqual(len(trace['traceEvents']), len(profiler.records))
+        self.assertTrue(all(e['ph'] == 'X' and e['dur'] >= 0 for e in trace['traceEvents']))
+
+
+if __name__ == '__main__':
+    unittest.main()
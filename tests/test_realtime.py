@@ -0,0 +1,72 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import unittest
+import numpy as np
+from scipy.io import wavfile
+
+from acoustician_tools.realtime import *
+from acoustician_tools.rir import _as_float, analyze_ir
+from acoustician_tools.bands import octave_bands
+
+
+class TestRealtime(unittest.TestCase):
+    def test_impulse_feed(self):
+        bands = octave_bands()['f_bound']
+        metrics = ['c50', 'c80', 'd50', 'ts', 'edt', 't20']
+        block_size = 4096
+
+        paths = ['tests/IR/IR_test_big_hall.wav', 'tests/IR/IR_test.wav']
+        sources = {path: wavfile.read(path)[::-1] for path in paths}  # (samples, sample rate)
+        y, sr = sources['tests/IR/IR_test_big_hall.wav']
+        sources['quiet'] = (_as_float(y) * 0.1, sr)  # Peak near -27dBFS, onset before the trigger
+
+        for name, (y, sr) in sources.items():
+            silence = np.zeros(sr // 2, dtype=y.dtype)
+            feed = np.concatenate([silence, y, silence, y])  # Two impulses
+            blocks = (feed[i : i + block_size] for i in range(0, len(feed), block_size))
+
+            # Record each event up to the end of the impulse-response, the samples analyze_ir reads
+            trigger = np.argmax(np.abs(_as_float(y)) >= 10 ** (-30 / 20))
+            duration = (len(y) - trigger + 0.5) / sr
+
+            received = []
+            analyzer = RealtimeAnalyzer(bands, sr, metrics, duration=duration, callback=received.append)
+            updates = [u for block in blocks for u in analyzer.process(block)] + analyzer.flush()
+            analyzer.close()
+            self.assertEqual(updates, received, msg='Callback receives every update')
+
+            levels = [u for u in updates if u['kind'] == 'level']
+            events = [u for u in updates if u['kind'] == 'event']
+            self.assertEqual(len(levels), int(np.ceil(len(feed) / block_size)))
+            self.assertEqual(len(events), 2)
+
+            expected = analyze_ir((y, sr), bands, metrics, onset_db=-20)
+            for event in events:
+                for metric in metrics:
+                    np.testing.assert_allclose(
+                        event['results'][metric], expected[metric], atol=1e-6, err_msg=f'{name} {metric}'
+                    )
+
+    def test_noise_feed(self):
+        sr, rt = 48000, 1.5
+        rng = np.random.default_rng(2)
+        t = np.arange(3 * sr) / sr
+        burst = np.concatenate([rng.standard_normal(sr), rng.standard_normal(3 * sr) * 10 ** (-3 * t / rt)])
+        feed = 0.1 * np.concatenate([burst, burst])  # Noise interrupted twice
+        bands = [(707, 1414), (1414, 2828)]
+
+        blocks = (feed[i : i + 2048] for i in range(0, len(feed), 2048))
+        updates = analyze_stream(blocks, bands, sr, ['t20', 't30'], mode='noise', duration=2)
+        events = [u for u in updates if u['kind'] == 'event']
+        np.testing.assert_allclose([e['time'] for e in events], [1, 5], atol=0.05)
+        for event in events:
+            np.testing.assert_allclose(event['results']['t30'], rt, atol=0.1)
+
+        with self.assertRaises(ValueError, msg='Energy parameters in noise mode'):
+            RealtimeAnalyzer(bands, sr, ['c80'], mode='noise')
+
+
+if __name__ == '__main__':
+    unittest.main()
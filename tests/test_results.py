@@ -0,0 +1,74 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import tempfile
+import unittest
+import numpy as np
+
+from acoustician_tools.results import *
+from acoustician_tools.rir import analyze_ir
+from acoustician_tools.bands import octave_bands
+from acoustician_tools.diffuser import qrd_diffuser_parameters
+from acoustician_tools.synthetic import synthetic_ir
+
+
+class TestResults(unittest.TestCase):
+    def setUp(self):
+        self.bands = octave_bands()['f_bound'][4:9]
+        self.metrics = ['c80', 't30']
+
+    def test_rir_records(self):
+        results = analyze_ir('tests/IR/IR_test.wav', self.bands, self.metrics)
+        table = rir_records('IR_test.wav', self.bands, results, seat='A1')
+        self.assertEqual(len(table), len(self.bands) * len(self.metrics))
+        np.testing.assert_array_equal(table.value[table.metric == 't30'], results['t30'])
+        self.assertTrue(np.all(table.seat == 'A1'))
+
+        y, sr = synthetic_ir(self.bands, 1.0, sr=16000, channels=2, seed=0)
+        results = analyze_ir((y, sr), self.bands[:3], self.metrics)
+        table = rir_records('synthetic', self.bands[:3], results)
+        right = table.value[(table.metric == 'c80') & (table.channel == 1)]
+        np.testing.assert_array_equal(right, np.array(results['c80'])[:, 1])
+
+    def test_records(self):
+        designs = [qrd_diffuser_parameters(f, 5, n) for f, n in [(500, 7), (800, 11), (1000, 7)]]
+        table = records(designs)
+        self.assertEqual(len(table), 3)
+        np.testing.assert_array_equal(table.design_frequency, [500, 800, 1000])
+        self.assertEqual(table.depth_sequence.shape, (3, 11), msg='Sequences padded to the longest one')
+        self.assertTrue(np.isnan(table.depth_sequence[0, -1]))
+        self.assertIn('high_cutoff_frequency_0°', table.dtype.names)
+
+    def test_store(self):
+        with tempfile.TemporaryDirectory() as folder:
+            store = ResultStore(folder)
+            expected = {}
+            for seat, path in enumerate(['tests/IR/IR_test.wav', 'tests/IR/IR_test_big_hall.wav']):
+                expected[path] = analyze_ir(path, self.bands, self.metrics)
+                store.append_results(path, self.bands, expected[path], seat=seat)
+            self.assertEqual(len(store), 2 * len(self.bands) * len(self.metrics))
+            self.assertEqual(len(store.shards()), 2)
+
+            t30 = store.query(['source', 'value'], metric='t30', band=500)
+            self.assertEqual(t30.source.tolist(), list(expected))
+            np.testing.assert_array_equal(t30.value, [r['t30'][1] for r in expected.values()])
+
+            reverberant = store.query(metric=['t30'], value=lambda v: v > 1.5)
+            np.testing.assert_array_equal(reverberant.seat, 1)
+
+            before = store.query()
+            store.compact()
+            self.assertEqual(len(store.shards()), 1)
+            np.testing.assert_array_equal(store.query(), before)
+            store.append_results('other', self.bands, expected[path], seat=2)
+            self.assertEqual(len(store.shards()), 2)
+
+            with self.assertRaises(ValueError, msg='Columns differ from the stored ones'):
+                store.append_results('other', self.bands, expected[path], seat=0, row=1)
+            with self.assertRaises(KeyError):
+                store.query(seats=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
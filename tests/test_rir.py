@@ -2,10 +2,15 @@ import sys
 
 sys.path.append('../acoustician-tools')
 
+import io
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from scipy.io import wavfile
 
 from acoustician_tools.rir import *
+from acoustician_tools.rir import _decay_range, _read_ir, _rt_from_schroeder
+from acoustician_tools.filter import butter_filterbank
 from acoustician_tools.bands import octave_bands, third_octave_bands
 
 
@@ -151,6 +156,195 @@ class TestRIR(unittest.TestCase):
         calculated = definition_from_ir('tests/IR/IR_test.wav', octave_bands()['f_bound'], 50)
         np.testing.assert_almost_equal(calculated, expected, decimal=5, err_msg='D50 Octave Bands - Room IR')
 
+    def test_analyze_ir(self):
+        bands = octave_bands()['f_bound']
+        for path in ['tests/IR/IR_test.wav', 'tests/IR/IR_test_big_hall.wav']:
+            calculated = analyze_ir(path, bands, ['c50', 'c80', 'd50', 'edt', 't20', 't30'])
+            self.assertEqual(calculated['c50'], clarity_from_ir(path, bands, 50))
+            self.assertEqual(calculated['c80'], clarity_from_ir(path, bands, 80))
+            self.assertEqual(calculated['d50'], definition_from_ir(path, bands, 50))
+            for estimator in ['edt', 't20', 't30']:
+                np.testing.assert_almost_equal(
+                    calculated[estimator], rt60_from_ir(path, bands, estimator), err_msg=estimator
+                )
+
+        with self.assertRaises(TypeError, msg='Invalid metric'):
+            analyze_ir('tests/IR/IR_test.wav', bands, ['t45'])
+
+    def test_multirate(self):
+        bands = octave_bands()['f_bound']
+        tolerances = np.where(np.array(bands)[:, 1] < 63, 0.05, 0.01)  # 15.6Hz and 31.25Hz octaves
+        for path in ['tests/IR/IR_test.wav', 'tests/IR/IR_test_big_hall.wav']:
+            expected = analyze_ir(path, bands, ['edt', 't20', 't30'])
+            calculated = analyze_ir(path, bands, ['edt', 't20', 't30'], multirate=True)
+            for estimator in expected:
+                np.testing.assert_array_less(
+                    np.abs(np.subtract(calculated[estimator], expected[estimator])), tolerances, err_msg=estimator
+                )
+            for func in [clarity_from_ir, definition_from_ir]:
+                expected = func(path, bands[2:], 50)
+                calculated = func(path, bands[2:], 50, multirate=True)
+                np.testing.assert_allclose(calculated, expected, atol=0.1, err_msg=func.__name__)
+
+            calculated = analyze_ir(path, bands, ['c80', 't20'], multirate=True)
+            self.assertEqual(calculated['c80'], clarity_from_ir(path, bands, 80, multirate=True))
+
+    def test_streaming(self):
+        bands = third_octave_bands()['f_bound']
+        path = 'tests/IR/IR_test_big_hall.wav'
+        expected = analyze_ir(path, bands, ['c50', 'd80', 'edt', 't20', 't30'])
+        for block_size in [1000, 65536]:
+            calculated = analyze_ir(path, bands, expected.keys(), block_size=block_size)
+            for metric in expected:
+                np.testing.assert_allclose(calculated[metric], expected[metric], atol=1e-6, err_msg=metric)
+
+        with self.assertRaises(ValueError, msg='Multirate in streaming mode'):
+            rt60_from_ir(path, bands, multirate=True, block_size=1000)
+
+    def test_in_memory_sources(self):
+        bands = octave_bands()['f_bound']
+        path = 'tests/IR/IR_test_big_hall.wav'
+        expected = analyze_ir(path, bands, ['c50', 'd80', 't20'])
+
+        sr, y = wavfile.read(path)
+        with open(path, 'rb') as f:
+            contents = f.read()
+        with open(path, 'rb') as f:
+            sources = [(y, sr), (y / 2**15, sr), contents, io.BytesIO(contents), f]
+            for source in sources:
+                calculated = analyze_ir(source, bands, expected.keys())
+                for metric in expected:
+                    np.testing.assert_allclose(calculated[metric], expected[metric], atol=1e-6, err_msg=metric)
+
+        y_float = y / 2**15
+        self.assertIs(_read_ir((y_float, sr))[1], y_float, msg='Contiguous float arrays are not copied')
+        np.testing.assert_array_equal(_read_ir((y, sr))[1], y_float, err_msg='Integer PCM scaled to float')
+
+    def test_multichannel(self):
+        bands = octave_bands()['f_bound']
+        sr, y = wavfile.read('tests/IR/IR_test_big_hall.wav')
+        delayed = np.concatenate([-np.ones(100, dtype=y.dtype), y[:-100]])  # Later onset, negative leading samples
+        channels = np.stack([y, delayed, y // 2], axis=-1)
+        metrics = ['c50', 'd80', 't20']
+
+        for options in [{}, {'multirate': True}, {'block_size': 20000}]:
+            calculated = analyze_ir((channels, sr), bands, metrics, **options)
+            for c in range(channels.shape[1]):
+                expected = analyze_ir((channels[:, c], sr), bands, metrics, **options)
+                for metric in metrics:
+                    np.testing.assert_allclose(
+                        np.asarray(calculated[metric])[:, c], expected[metric], atol=1e-6, err_msg=f'{metric} {options}'
+                    )
+
+    def test_workers(self):
+        bands = third_octave_bands()['f_bound']
+        path = 'tests/IR/IR_test_big_hall.wav'
+        metrics = ['c80', 'd50', 'edt', 't20']
+        expected = analyze_ir(path, bands, metrics)
+        self.assertEqual(analyze_ir(path, bands, metrics, workers=4), expected)
+        self.assertEqual(rt60_from_ir(path, bands, 't20', workers=4), expected['t20'])
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(analyze_ir(path, bands, metrics, workers=executor), expected)
+            calculated = analyze_ir(path, bands, metrics, block_size=30000, workers=executor)
+            for metric in metrics:
+                np.testing.assert_allclose(calculated[metric], expected[metric], atol=1e-6, err_msg=metric)
+
+    def test_energy_index(self):
+        bands = octave_bands()['f_bound']
+        path = 'tests/IR/IR_test.wav'
+        index = energy_index_from_ir(path, bands)
+
+        calculated = index.clarity([50, 80])
+        self.assertEqual(calculated.shape, (len(bands), 2))
+        np.testing.assert_almost_equal(calculated[:, 0], clarity_from_ir(path, bands, 50), decimal=5)
+        np.testing.assert_almost_equal(calculated[:, 1], clarity_from_ir(path, bands, 80), decimal=5)
+        np.testing.assert_almost_equal(index.definition(50), definition_from_ir(path, bands, 50), decimal=5)
+
+        # Center time of a decaying exponential energy envelope exp(-t / tau) is tau
+        sr, tau = 48000, 0.1
+        index = EnergyIndex(np.exp(-np.arange(sr) / (sr * tau))[None, :], sr)
+        np.testing.assert_allclose(index.center_time(), [tau * 1000], rtol=1e-3)
+
+        # Truncated at a crosspoint, with the geometric tail and its moment compensated
+        r, crosspoint = np.exp(-1 / (sr * tau)), sr // 10
+        e_c = r**crosspoint
+        tail, tail_moment = e_c / (1 - r), crosspoint * e_c / (1 - r) + e_c * r / (1 - r) ** 2
+        index = EnergyIndex(r ** np.arange(crosspoint)[None, :], sr, tail, tail_moment)
+        np.testing.assert_allclose(index.center_time(), [r / (1 - r) / sr * 1000], rtol=1e-9)
+
+        expected = center_time_from_ir(path, bands)
+        np.testing.assert_allclose(analyze_ir(path, bands, ['ts'], block_size=5000)['ts'], expected, atol=1e-6)
+
+    def test_onset(self):
+        y = np.concatenate([np.full(50, 1e-3), [0.05, -0.5, 1.0, 0.3]])  # Low-level noise before the impulse
+        self.assertEqual(ir_onset(y), 51, msg='First sample within 20dB of the peak')
+        self.assertEqual(ir_onset(y, threshold_db=-40), 50)
+        self.assertEqual(ir_onset(y, threshold_db=None), 0, msg='First positive sample')
+        np.testing.assert_array_equal(ir_onset(np.stack([y, np.roll(y, -3)], axis=-1)), [51, 48])
+
+    def test_noise_truncation(self):
+        sr, rt = 48000, 1.0
+        rng = np.random.default_rng(0)
+        t = np.arange(3 * sr) / sr
+        clean = rng.standard_normal(len(t)) * 10 ** (-3 * t / rt)  # 60dB energy decay in rt seconds
+        noisy = np.concatenate([np.zeros(1000), clean]) + 10 ** (-45 / 20) * rng.standard_normal(len(t) + 1000)
+        bands = [(707, 1414), (1414, 2828)]
+
+        crosspoint, noise_db, tail = lundeby_truncation(butter_filterbank(noisy, bands[:1], sr)[0] ** 2, sr)
+        self.assertLess(crosspoint, len(noisy))
+        self.assertGreater(tail, 0)
+        self.assertLess(noise_db, -30)
+
+        self.assertGreater(min(rt60_from_ir((noisy, sr), bands, 't30')), 1.2, msg='Noise floor biases the decay')
+        calculated = rt60_from_ir((noisy, sr), bands, 't30', onset_db=-20, truncate=True)
+        np.testing.assert_allclose(calculated, rt, atol=0.1)
+
+        options = {'onset_db': -20, 'truncate': True}
+        for metric in ['c80', 'd50', 'ts']:
+            expected = analyze_ir((clean, sr), bands, [metric])[metric]
+            calculated = analyze_ir((noisy, sr), bands, [metric], **options)[metric]
+            np.testing.assert_allclose(calculated, expected, rtol=0.02, err_msg=metric)
+
+        path = 'tests/IR/IR_test_big_hall.wav'
+        metrics = ['c50', 'd80', 'edt', 't20']
+        expected = analyze_ir(path, bands, metrics, onset_db=-20)
+        calculated = analyze_ir(path, bands, metrics, onset_db=-20, block_size=20000)
+        for metric in metrics:
+            np.testing.assert_allclose(calculated[metric], expected[metric], atol=1e-6, err_msg=metric)
+        with self.assertRaises(ValueError, msg='Truncation in streaming mode'):
+            rt60_from_ir(path, bands, truncate=True, block_size=1000)
+
+    def test_low_memory(self):
+        bands = third_octave_bands()['f_bound']
+        path = 'tests/IR/IR_test_big_hall.wav'
+        metrics = ['edt', 't20', 't30']
+        expected = analyze_ir(path, bands, metrics)
+        calculated = analyze_ir(path, bands, metrics, dtype='float32', workers=2)
+        for metric in metrics:
+            np.testing.assert_allclose(calculated[metric], expected[metric], atol=1e-3, err_msg=metric)
+
+        options = {'onset_db': -20, 'truncate': True}
+        expected = rt60_from_ir(path, bands, 't20', **options)
+        calculated = rt60_from_ir(path, bands, 't20', dtype=np.float32, **options)
+        np.testing.assert_allclose(calculated, expected, atol=1e-3)
+
+    def test_decay_regression(self):
+        sr, rt = 48000, 2.0
+        curves = -60 * np.arange(3 * sr)[None, :] / (sr * np.array([[rt], [rt / 2]]))  # Linear decays [dB]
+        ranges = [_decay_range(e) for e in ['edt', 't10', 't20', 't30', 't60']]
+        calculated = _rt_from_schroeder(curves, sr, ranges)
+        self.assertEqual(calculated.shape, (len(ranges), 2))
+        np.testing.assert_allclose(calculated, [[rt, rt / 2]] * len(ranges), rtol=1e-3)
+        with self.assertRaises(ValueError, msg='Range end not reached'):
+            _rt_from_schroeder(curves[:, :sr], sr, ranges)
+
+        bands = octave_bands()['f_bound']
+        path = 'tests/IR/IR_test_big_hall.wav'
+        calculated = analyze_ir(path, bands, ['edt', 't10', 't20', 't30'])
+        for estimator in calculated:
+            self.assertEqual(calculated[estimator], rt60_from_ir(path, bands, estimator), msg=estimator)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -99,6 +99,61 @@ class TestRoom(unittest.TestCase):
             decimal=2,
         )
 
+    def test_batch(self):
+        rng = np.random.default_rng(0)
+        dimensions = rng.uniform(3, 20, (50, 3))
+        volumes = np.prod(dimensions, axis=-1)
+        surfaces = np.array([shoebox_surfaces(*d) for d in dimensions])
+        alphas = rng.uniform(0.01, 0.9, (50, 4, 6))  # [rooms, bands, surfaces]
+
+        calculated = rt_all(volumes[:, None], surfaces[:, None], alphas)
+        for name, formula in [
+            ('sabine', rt_sabine),
+            ('eyring', rt_eyring),
+            ('millington', rt_millington),
+            ('fitzroy', rt_fitzroy),
+            ('arau', rt_arau),
+        ]:
+            batch = formula(volumes[:, None], surfaces[:, None], alphas)
+            self.assertEqual(batch.shape, (50, 4))
+            expected = [formula(v, s, a) for v, s, a in zip(volumes, surfaces, alphas)]
+            np.testing.assert_allclose(batch, expected, rtol=1e-12, err_msg=name)
+            np.testing.assert_allclose(calculated[name], expected, rtol=1e-12, err_msg=name)
+
+        calculated = rt_all(self.volume, self.surfaces, self.alpha_multiband.tolist())
+        np.testing.assert_almost_equal(calculated['fitzroy'], [0.48, 0.21, 0.13], decimal=2)
+        self.assertAlmostEqual(calculated['sabine'][1], rt_sabine(self.volume, self.surfaces, self.alpha))
+
+    def test_room_model(self):
+        model = RoomModel.shoebox(*self.dimensions, self.alpha_multiband)
+        expected = rt_all(self.volume, self.surfaces, self.alpha_multiband)
+        for name, rt in model.rt().items():
+            np.testing.assert_allclose(rt, expected[name], rtol=1e-12, err_msg=name)
+
+        rng = np.random.default_rng(0)
+        alphas = self.alpha_multiband.copy()
+        for _ in range(200):  # Random treatments, one surface at a time
+            i = rng.integers(6)
+            alphas[:, i] = rng.uniform(0.01, 0.95, 3)
+            model.set_alphas(RoomModel.SHOEBOX_NAMES[i], alphas[:, i])
+        expected = rt_all(self.volume, self.surfaces, alphas)
+        for name, rt in model.rt().items():
+            np.testing.assert_allclose(rt, expected[name], rtol=1e-9, err_msg=name)
+
+        # A panel covering part of the floor
+        model.set_area('floor', self.surfaces[4] - 2)
+        model.add_surface(2, 0.9, axis=2, name='panel')
+        surfaces = self.surfaces[:4] + [self.surfaces[4] - 2, self.surfaces[5], 2]
+        panel_alphas = np.hstack([alphas, np.full((3, 1), 0.9)])
+        for name, formula in [('sabine', rt_sabine), ('eyring', rt_eyring), ('millington', rt_millington)]:
+            np.testing.assert_allclose(model.rt()[name], formula(self.volume, surfaces, panel_alphas), rtol=1e-9)
+        model.remove_surface('panel')
+        model.set_area('floor', self.surfaces[4])
+        for name, rt in model.rt().items():
+            np.testing.assert_allclose(rt, expected[name], rtol=1e-9, err_msg=name)
+        with self.assertRaises(KeyError):
+            model.add_surface(1, 0.5, axis=0, name='floor')
+
     def test_schroeder_frequency(self):
         expected = 346.41
         calculated = schroeder_frequency(1.2, 40)
@@ -0,0 +1,58 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import unittest
+import numpy as np
+
+from acoustician_tools.simulation import *
+from acoustician_tools.rir import analyze_ir
+from acoustician_tools.room import rt_eyring
+from acoustician_tools.bands import octave_bands
+from acoustician_tools.utils import shoebox_surfaces
+
+
+class TestSimulation(unittest.TestCase):
+    def setUp(self):
+        self.dimensions = [6, 4, 3]
+        self.source, self.receiver = [1.5, 1.0, 1.2], [4.0, 2.5, 1.6]
+
+    def test_first_order(self):
+        alphas = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+        y, sr = shoebox_ir(self.dimensions, self.source, self.receiver, alphas, max_order=1, taps=0, workers=1)
+
+        # Direct sound and one reflection on each surface, mirrored along its axis
+        images = [(np.array(self.source, dtype=float), 1.0)]
+        for axis, (low, high) in zip(range(3), AXIS_SURFACES):
+            for surface, wall in [(low, 0), (high, self.dimensions[axis])]:
+                image = np.array(self.source, dtype=float)
+                image[axis] = 2 * wall - image[axis]
+                images.append((image, np.sqrt(1 - alphas[surface])))
+        expected = np.zeros_like(y)
+        for image, reflection in images:
+            distance = np.linalg.norm(image - self.receiver)
+            expected[int(np.round(distance / 343 * sr))] += reflection / (4 * np.pi * distance)
+        np.testing.assert_allclose(y, expected, atol=1e-12)
+
+    def test_analysis(self):
+        bands = octave_bands()['f_bound'][5:9]
+        alphas = np.repeat(np.array([0.15, 0.25, 0.35, 0.45])[:, None], 6, axis=1)  # [bands, surfaces]
+        receivers = [self.receiver, [5.0, 1.0, 2.0]]
+        y, sr = shoebox_ir(self.dimensions, self.source, receivers, alphas, bands, sr=16000, workers=1)
+        self.assertEqual(y.shape[1], 2)
+        parallel, _ = shoebox_ir(self.dimensions, self.source, receivers, alphas, bands, sr=16000, workers=2)
+        np.testing.assert_allclose(y, parallel)
+
+        # Specular reflections in a shoebox decay slower than the diffuse-field prediction
+        results = analyze_ir((y, sr), bands, ['t20', 'c80'])
+        t20 = np.array(results['t20'])  # [bands, receivers]
+        expected = rt_eyring(np.prod(self.dimensions), shoebox_surfaces(*self.dimensions), alphas)
+        self.assertTrue(np.all(np.diff(t20, axis=0) < 0), msg='More absorption, shorter decay')
+        self.assertTrue(np.all((t20 > 0.9 * expected[:, None]) & (t20 < 2 * expected[:, None])))
+
+        with self.assertRaises(ValueError):
+            shoebox_ir(self.dimensions, [7, 1, 1], self.receiver, alphas[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import unittest
+import numpy as np
+
+from acoustician_tools.synthetic import *
+from acoustician_tools.rir import analyze_ir, ir_onset, rt60_from_ir
+from acoustician_tools.bands import octave_bands
+
+
+class TestSynthetic(unittest.TestCase):
+    def setUp(self):
+        self.bands = octave_bands()['f_bound']
+        self.measured = slice(4, 10)  # 250Hz to 8kHz
+
+    def test_shapes(self):
+        y, sr = synthetic_ir(self.bands, 1.0, sr=16000, duration=0.5, seed=0)
+        self.assertEqual((y.shape, sr), ((8000,), 16000))
+        self.assertAlmostEqual(np.max(np.abs(y)), 1.0)
+
+        y, _ = synthetic_ir(self.bands, 1.0, sr=16000, duration=0.5, channels=2, batch=3, seed=0)
+        self.assertEqual(y.shape, (3, 8000, 2))
+        np.testing.assert_array_equal(y, synthetic_ir(self.bands, 1.0, 16000, 0.5, channels=2, batch=3, seed=0)[0])
+        self.assertFalse(np.allclose(y[0], y[1]), msg='Every IR has its own noise')
+
+        y, sr = synthetic_ir(self.bands, 1.0, predelay=0.1, seed=0)
+        self.assertTrue(np.all(y[: int(0.1 * sr)] == 0))
+        self.assertGreaterEqual(ir_onset(y), int(0.1 * sr))
+
+    def test_decay_times(self):
+        rt = np.linspace(2.5, 0.8, len(self.bands))
+        ir = synthetic_ir(self.bands, rt, seed=0)
+        bands = self.bands[self.measured]
+        np.testing.assert_allclose(rt60_from_ir(ir, bands, 't30'), rt[self.measured], rtol=0.05)
+
+        ir = synthetic_ir(self.bands, 1.0, noise_floor_db=-50, seed=1)
+        calculated = rt60_from_ir(ir, bands[1:], 't20', onset_db=-20, truncate=True)
+        np.testing.assert_allclose(calculated, 1.0, rtol=0.05)
+
+        # Double-slope decay; the early decay follows the first slope, T30 reaches into the second
+        ir = synthetic_ir(self.bands, 0.5, late_rt=2.0, knee_db=-25, seed=1)
+        calculated = analyze_ir(ir, bands, ['edt', 't30'])
+        np.testing.assert_allclose(calculated['edt'], 0.5, rtol=0.2)
+        self.assertTrue(np.all(np.asarray(calculated['t30']) > 0.8))
+
+
+if __name__ == '__main__':
+    unittest.main()
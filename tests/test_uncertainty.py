@@ -0,0 +1,47 @@
+import sys
+
+sys.path.append('../acoustician-tools')
+
+import unittest
+import numpy as np
+
+from acoustician_tools.uncertainty import *
+from acoustician_tools.room import rt_eyring, rt_sabine
+from acoustician_tools.utils import shoebox_surfaces
+
+
+class TestUncertainty(unittest.TestCase):
+    def setUp(self):
+        self.volume, self.surfaces = 24, shoebox_surfaces(4, 3, 2)
+        self.alphas = np.array([[0.2, 0.2, 0.3, 0.3, 0.1, 0.1], [0.5, 0.5, 0.5, 0.5, 0.2, 0.2]])
+
+    def test_no_spread(self):
+        results = rt_uncertainty(self.volume, self.surfaces, self.alphas, alpha_spread=0, samples=1000, workers=1)
+        expected = rt_eyring(self.volume, self.surfaces, self.alphas)
+        np.testing.assert_allclose(results['nominal'], expected)
+        for values in results['percentiles'].values():
+            np.testing.assert_allclose(values, expected, rtol=1e-6)
+
+    def test_spread(self):
+        options = {'samples': 200000, 'chunk_size': 30000, 'seed': 3, 'surface_spread': 0.02, 'c_spread': 2}
+        options['formula'] = ['sabine', 'eyring']
+        results = rt_uncertainty(self.volume, self.surfaces, self.alphas, workers=1, **options)
+        self.assertEqual(results, rt_uncertainty(self.volume, self.surfaces, self.alphas, workers=2, **options))
+        for formula in ['sabine', 'eyring']:
+            low, median, high = (np.array(v) for v in results[formula]['percentiles'].values())
+            self.assertTrue(np.all((low < median) & (median < high)))
+            np.testing.assert_allclose(median, results[formula]['nominal'], rtol=0.02)
+
+        # Only the sound speed varies; RT is inversely proportional to it
+        options = {'alpha_spread': 0, 'c_spread': 5, 'distribution': 'uniform', 'percentiles': [0, 100]}
+        results = rt_uncertainty(self.volume, self.surfaces, self.alphas[0], formula='sabine', samples=10000, **options)
+        nominal = rt_sabine(self.volume, self.surfaces, self.alphas[0])
+        np.testing.assert_allclose(results['percentiles'][0], nominal * 343 / 348, rtol=1e-3)
+        np.testing.assert_allclose(results['percentiles'][100], nominal * 343 / 338, rtol=1e-3)
+
+        with self.assertRaises(ValueError):
+            rt_uncertainty(self.volume, self.surfaces, self.alphas, formula='kuttruff')
+
+
+if __name__ == '__main__':
+    unittest.main()